@@ -0,0 +1,162 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import cache
+from django.core.cache.backends.base import BaseCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.cache import cache_is_shared
+from core.metrics import auth_lookups
+from users.models import CustomUser
+
+VERSION_CLAIM = "ver"
+USER_CLAIMS = ("username", "role", "is_superuser")
+TOKEN_VERSION_KEY = "api:auth:token-version:{}"
+TOKEN_VERSION_TIMEOUT = 300
+
+
+class ClaimsAccessToken(AccessToken):
+    """Токен доступа с ролью и именем пользователя в полезной нагрузке.
+
+    По этим полям ClaimsJWTAuthentication строит пользователя без запроса
+    к базе. Поле `ver` - версия токенов пользователя: при изменении роли,
+    имени или блокировке она растёт, и выданные ранее токены отзываются.
+    """
+
+    @classmethod
+    def for_user(cls: any, user: CustomUser) -> "ClaimsAccessToken":
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+class TokenVersions:
+    """Кеш версий токенов пользователей в памяти процесса.
+
+    В памяти процесса версия хранится `ttl` секунд, затем читается из
+    кеша Django `backend`, если он общий для процессов сервера (см.
+    cache_is_shared), а при промахе или с кешем процесса - из базы.
+    Изменение пользователя удаляет версию из общего кеша после фиксации
+    транзакции, поэтому в других процессах оно вступает в силу не позже
+    чем через ttl; TOKEN_VERSION_TIMEOUT лишь ограничивает жизнь записи
+    в кеше.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 5.0,
+        size: int = 10000,
+        backend: BaseCache = None,
+    ) -> None:
+        self.ttl = ttl
+        self.size = size
+        self.backend = backend
+        self.versions = OrderedDict()
+        self.lock = Lock()
+
+    @property
+    def cache(self) -> BaseCache:
+        return self.backend or cache
+
+    def get(self, user_id: int) -> int:
+        """Версия токенов активного пользователя, иначе None."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.versions.get(user_id)
+        if entry is not None and entry[1] > now:
+            auth_lookups.inc("memory")
+            return entry[0]
+        key = TOKEN_VERSION_KEY.format(user_id)
+        shared = cache_is_shared(self.cache)
+        version = self.cache.get(key) if shared else None
+        auth_lookups.inc("cache" if version is not None else "db")
+        if version is None:
+            version = self.read(user_id)
+            if shared:
+                self.cache.set(key, version, TOKEN_VERSION_TIMEOUT)
+        with self.lock:
+            self.versions[user_id] = (version, now + self.ttl)
+            self.versions.move_to_end(user_id)
+            while len(self.versions) > self.size:
+                self.versions.popitem(last=False)
+        return version if version >= 0 else None
+
+    def read(self, user_id: int) -> int:
+        """Версия из основной базы: реплика может не знать об отзыве."""
+        users = CustomUser.objects.using(DEFAULT_DB_ALIAS)
+        row = users.filter(pk=user_id).values_list(
+            "token_version",
+            "is_active",
+        ).first()
+        return row[0] if row and row[1] else -1
+
+    def forget(self, user_id: int) -> None:
+        """Сбрасывает версию сейчас и после фиксации транзакции.
+
+        Без повторного сброса другой процесс мог бы до фиксации прочитать
+        из базы старую версию и вернуть её в общий кеш.
+        """
+        key = TOKEN_VERSION_KEY.format(user_id)
+        self.cache.delete(key)
+        transaction.on_commit(lambda: self.cache.delete(key))
+        with self.lock:
+            self.versions.pop(user_id, None)
+
+
+token_versions = TokenVersions()
+
+
+def build_user(validated_token: AccessToken) -> CustomUser:
+    """Пользователь из полей токена; остальные поля загрузятся по запросу."""
+    fields = ["id", *USER_CLAIMS, "is_active", "token_version"]
+    values = [
+        validated_token[api_settings.USER_ID_CLAIM],
+        *(validated_token[claim] for claim in USER_CLAIMS),
+        True,
+        validated_token[VERSION_CLAIM],
+    ]
+    user = CustomUser.from_db(None, fields, values)
+    user.from_token = True
+    return user
+
+
+def load_user(user: CustomUser) -> CustomUser:
+    """Полностью загруженный пользователь для изменения и вывода профиля."""
+    if getattr(user, "from_token", False):
+        return CustomUser.objects.get(pk=user.pk)
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без чтения пользователя из базы.
+
+    Для токенов ClaimsAccessToken пользователь строится из полей токена,
+    а актуальность токена проверяется по закешированной версии токенов
+    пользователя. Токены без этих полей обрабатываются как обычно.
+    """
+
+    def get_user(self: any, validated_token: AccessToken) -> CustomUser:
+        claims = (api_settings.USER_ID_CLAIM, VERSION_CLAIM, *USER_CLAIMS)
+        if any(claim not in validated_token for claim in claims):
+            return super().get_user(validated_token)
+        version = token_versions.get(
+            validated_token[api_settings.USER_ID_CLAIM],
+        )
+        if version is None:
+            raise AuthenticationFailed(
+                "Пользователь не найден или заблокирован",
+                code="user_not_found",
+            )
+        if version != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                "Токен отозван",
+                code="token_revoked",
+            )
+        return build_user(validated_token)
@@ -0,0 +1,272 @@
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Model
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+VERSION_KEY = "api:version:{}"
+# Версия всех данных: меняется при массовой загрузке в обход сигналов.
+EPOCH_NAMESPACE = "epoch"
+
+
+def cache_is_shared(backend: BaseCache = None) -> bool:
+    """Видят ли все процессы сервера одни и те же записи кеша.
+
+    Кеш в памяти процесса общий, только если процесс сервера один
+    (SERVER_PROCESSES): иначе версии данных и токенов, счётчики частоты
+    в каждом процессе свои.
+    """
+    if backend is None:
+        backend = caches[DEFAULT_CACHE_ALIAS]
+    return (
+        not isinstance(backend, LocMemCache)
+        or getattr(settings, "SERVER_PROCESSES", 1) <= 1
+    )
+
+
+def get_version(namespace: str) -> float:
+    """Текущая версия данных пространства имён (время последнего изменения).
+
+    Версия - целое число секунд, поэтому её можно отдавать в Last-Modified.
+    Если версия ещё не записана или вытеснена из кеша, она заводится заново,
+    что лишь делает недействительными ранее закешированные значения.
+    """
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        version = math.ceil(time.time())
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(*namespaces: str) -> None:
+    """Помечает данные пространств имён изменёнными.
+
+    Новая версия хотя бы на секунду больше прежней: иначе после двух
+    изменений за одну секунду Last-Modified не изменился бы, и клиент с
+    If-Modified-Since получил бы 304 на устаревшие данные.
+    """
+    now = math.ceil(time.time())
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, math.ceil(versions.get(key, 0)) + 1) for key in keys},
+        None,
+    )
+
+
+def model_namespace(model: Model) -> str:
+    return f"model:{model._meta.label_lower}"
+
+
+def children_namespace(model: Model, parent_id: any) -> str:
+    """Пространство имён записей model, принадлежащих одной родительской."""
+    return f"{model_namespace(model)}:parent:{parent_id}"
+
+
+def request_role(request: Request) -> str:
+    user = request.user
+    if not user.is_authenticated:
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+    return user.role
+
+
+def make_key(prefix: str, *parts: any) -> str:
+    digest = hashlib.md5(
+        "\x1f".join(str(part) for part in parts).encode(),
+    ).hexdigest()
+    return f"api:{prefix}:{digest}"
+
+
+RESPONSE_STATS_KEY = "api:stats:response:{}:{}"
+RESPONSE_CACHE_HIT = "hit"
+RESPONSE_CACHE_MISS = "miss"
+
+cached_viewsets = []
+
+
+def count_event(key: str) -> None:
+    """Увеличивает счётчик в кеше, заводя его при первом событии."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def response_cache_stats() -> dict:
+    """Попадания и промахи кеша ответов по вьюсетам."""
+    keys = {
+        RESPONSE_STATS_KEY.format(viewset.__name__, event): (
+            viewset.__name__,
+            event,
+        )
+        for viewset in cached_viewsets
+        for event in (RESPONSE_CACHE_HIT, RESPONSE_CACHE_MISS)
+    }
+    values = cache.get_many(keys)
+    stats = {}
+    for key, (name, event) in keys.items():
+        stats.setdefault(name, {})[event] = values.get(key, 0)
+    return stats
+
+
+def cache_response(handler: any) -> any:
+    """Оборачивает действие вьюсета CachedResponseMixin кешем ответов."""
+
+    @wraps(handler)
+    def wrapper(
+        self: any,
+        request: Request,
+        *args: any,
+        **kwargs: any,
+    ) -> Response:
+        if not cache_is_shared():
+            return handler(self, request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            self.count_response_cache(RESPONSE_CACHE_HIT)
+            response = Response(data)
+            response[self.cache_header] = "HIT"
+            return response
+        response = handler(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        self.count_response_cache(RESPONSE_CACHE_MISS)
+        response[self.cache_header] = "MISS"
+        return response
+
+    wrapper.response_cached = True
+    return wrapper
+
+
+class CachedResponseMixin:
+    """Кеширует ответы действий `cached_actions` вьюсета (list, retrieve).
+
+    Ключ ответа строится из пути с параметрами запроса, роли пользователя,
+    общей версии данных (EPOCH_NAMESPACE) и версий моделей `cache_models`:
+    сигнал об изменении любой из них меняет версию, и закешированные ответы
+    перестают использоваться. Кешируются
+    данные ответа до рендеринга, поэтому формат ответа выбирается как
+    обычно. Заголовок `X-Cache` сообщает о попадании в кеш. Версии живут
+    в кеше Django, поэтому с кешем, не общим для процессов сервера (см.
+    cache_is_shared), ответы не кешируются.
+    """
+
+    cache_models = ()
+    cache_timeout = 300
+    cache_header = "X-Cache"
+    cached_actions = ("list", "retrieve")
+
+    def __init_subclass__(cls: any, **kwargs: any) -> None:
+        super().__init_subclass__(**kwargs)
+        cached_viewsets.append(cls)
+        for action in cls.cached_actions:
+            handler = getattr(cls, action, None)
+            if handler and not getattr(handler, "response_cached", False):
+                setattr(cls, action, cache_response(handler))
+
+    def get_response_cache_key(self: any, request: Request) -> str:
+        namespaces = [
+            EPOCH_NAMESPACE,
+            *(model_namespace(model) for model in self.cache_models),
+        ]
+        versions = [get_version(namespace) for namespace in namespaces]
+        return make_key(
+            "response",
+            type(self).__name__,
+            *versions,
+            request.get_full_path(),
+            request_role(request),
+        )
+
+    def count_response_cache(self: any, event: str) -> None:
+        count_event(RESPONSE_STATS_KEY.format(type(self).__name__, event))
+
+
+def conditional_get(handler: any) -> any:
+    """Оборачивает действие вьюсета ConditionalGetMixin условным GET."""
+
+    @wraps(handler)
+    def wrapper(
+        self: any,
+        request: Request,
+        *args: any,
+        **kwargs: any,
+    ) -> Response:
+        if not cache_is_shared():
+            return handler(self, request, *args, **kwargs)
+        etag, last_modified = self.get_validators(request)
+        not_modified = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if not_modified is not None:
+            response = not_modified
+        else:
+            response = handler(self, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    wrapper.conditional_get = True
+    return wrapper
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы к действиям `conditional_actions` вьюсета.
+
+    Валидаторы ответа строятся из версий пространств имён данных (см.
+    get_validator_namespaces) без запросов к базе: ETag - хеш версий,
+    пути с параметрами и роли, Last-Modified - время последнего изменения.
+    Если клиент прислал совпадающий If-None-Match или If-Modified-Since,
+    отвечаем 304 без выборки и сериализации. Пока кеш не общий для
+    процессов сервера, валидаторы не выдаются: процесс, не видевший
+    изменения, ответил бы 304 на устаревшие данные.
+    """
+
+    conditional_actions = ("list", "retrieve")
+
+    def __init_subclass__(cls: any, **kwargs: any) -> None:
+        super().__init_subclass__(**kwargs)
+        for action in cls.conditional_actions:
+            handler = getattr(cls, action, None)
+            if handler and not getattr(handler, "conditional_get", False):
+                setattr(cls, action, conditional_get(handler))
+
+    def get_validator_namespaces(self: any) -> list:
+        """Пространства имён, от которых зависит ответ.
+
+        По умолчанию - модели `cache_models` вьюсета.
+        """
+        return [
+            model_namespace(model)
+            for model in getattr(self, "cache_models", ())
+        ]
+
+    def get_validators(self: any, request: Request) -> tuple:
+        namespaces = [EPOCH_NAMESPACE, *self.get_validator_namespaces()]
+        versions = [get_version(namespace) for namespace in namespaces]
+        etag = make_key(
+            "etag",
+            type(self).__name__,
+            *versions,
+            request.get_full_path(),
+            request_role(request),
+        ).rsplit(":", 1)[-1]
+        return quote_etag(etag), max(versions)
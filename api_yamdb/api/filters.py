@@ -1,11 +1,15 @@
 import django_filters
+from django.db.models import QuerySet
 
 from reviews.models import Title
+from reviews.search import get_search_backend
 
 
 class TitlesFilter(django_filters.FilterSet):
     """
     Фильтрует объекты модели Title по категории, жанру, году и имени.
+    Параметр search ищет по названию и описанию через поисковый индекс
+    и упорядочивает произведения по релевантности.
     """
 
     category = django_filters.CharFilter(field_name="category__slug")
@@ -15,7 +19,16 @@ class TitlesFilter(django_filters.FilterSet):
         lookup_expr="icontains",
     )
     year = django_filters.NumberFilter(field_name="year")
+    search = django_filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Title
-        fields = ("category", "genre", "year", "name")
+        fields = ("category", "genre", "year", "name", "search")
+
+    def filter_search(
+        self: any,
+        queryset: QuerySet,
+        name: str,
+        value: str,
+    ) -> QuerySet:
+        return get_search_backend().search(queryset, value)
@@ -0,0 +1,376 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from api.cache import (
+    EPOCH_NAMESPACE,
+    get_version,
+    make_key,
+    model_namespace,
+)
+from core.metrics import pagination_counts
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+
+
+def _row_value(row: any, field: str) -> any:
+    if isinstance(row, dict):
+        return row[field]
+    return getattr(row, field)
+
+
+def _cursor_value(value: any) -> any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """Постраничный вывод по ключу сортировки (keyset).
+
+    Курсор хранит значения полей сортировки последней выданной записи,
+    поэтому следующая страница выбирается условием по индексу, а не
+    пропуском offset строк, и не требует COUNT(*). Поля сортировки задаются
+    атрибутом `keyset_ordering` вьюсета и должны однозначно упорядочивать
+    записи (последним полем обычно идёт id).
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = api_settings.PAGE_SIZE
+    max_limit = None
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(
+        self: any,
+        queryset: QuerySet,
+        request: Request,
+        view: any = None,
+    ) -> list:
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(view.keyset_ordering)
+        self.limit = self.get_limit(request)
+        position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [self._reverse_field(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position))
+
+        rows = list(queryset[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.position = position
+        return self.page
+
+    def get_paginated_response(self: any, data: list) -> Response:
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self: any, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_limit(self: any, request: Request) -> int:
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        if self.max_limit:
+            return min(limit, self.max_limit)
+        return limit
+
+    def get_next_link(self: any) -> str:
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(self.get_position(self.page[-1]))
+        return self.encode_cursor(self.position)
+
+    def get_previous_link(self: any) -> str:
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self.get_position(self.page[0])
+        else:
+            position = self.position
+        return self.encode_cursor(position, reverse=True)
+
+    def get_position(self: any, row: any) -> list:
+        return [
+            _cursor_value(_row_value(row, field.lstrip("-")))
+            for field in self.ordering
+        ]
+
+    def keyset_filter(self: any, position: list) -> Q:
+        """Условие «запись идёт после position» в текущем направлении."""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != self.reverse
+            lookup = "lt" if descending else "gt"
+            step = Q(**{f"{name}__{lookup}": position[index]})
+            for previous, value in zip(self.ordering[:index], position):
+                step &= Q(**{previous.lstrip("-"): value})
+            condition |= step
+        return condition
+
+    def decode_cursor(self: any, request: Request, model: Model) -> tuple:
+        """Позиция и направление из курсора запроса.
+
+        Значения позиции приводятся к типам полей сортировки модели, чтобы
+        подделанный курсор давал 404, а не ошибку в запросе к базе.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = cursor["p"]
+            reverse = bool(cursor.get("r"))
+        except (
+            binascii.Error,
+            KeyError,
+            TypeError,
+            UnicodeDecodeError,
+            ValueError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                self.parse_value(model, field.lstrip("-"), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def parse_value(model: Model, name: str, value: any) -> any:
+        if value is None or isinstance(value, (bool, dict, list)):
+            raise ValueError(f"Недопустимое значение курсора: {value!r}")
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def encode_cursor(self: any, position: list, reverse: bool = False) -> str:
+        cursor = {"p": position}
+        if reverse:
+            cursor["r"] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(cursor, separators=(",", ":")).encode(),
+        ).decode()
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded,
+        )
+
+    @staticmethod
+    def _reverse_field(field: str) -> str:
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def planner_estimate(queryset: QuerySet) -> int:
+    """Оценка числа строк по статистике планировщика СУБД.
+
+    PostgreSQL оценивает любой запрос через EXPLAIN; для SQLite доступна
+    только оценка размера таблицы без фильтров из sqlite_stat1 (заполняется
+    командой ANALYZE). Если оценки нет, возвращает None.
+    """
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        if connection.vendor == "sqlite" and not queryset.query.where:
+            cursor.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'sqlite_stat1'",
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                return int(row[0].split()[0])
+    return None
+
+
+class ApiPagination(LimitOffsetPagination):
+    """Пагинация API: limit/offset по умолчанию и keyset по запросу.
+
+    Клиент включает keyset-режим параметром `pagination=cursor` (ссылки
+    next/previous сохраняют его вместе с курсором). Режим доступен только
+    вьюсетам с атрибутом `keyset_ordering`.
+
+    Способ подсчёта `count` задаётся атрибутом вьюсета `pagination_count`:
+    - "exact" - COUNT(*) на каждый запрос;
+    - "cached" - точный COUNT(*), закешированный на
+      `pagination_count_timeout` секунд и сбрасываемый при записи в модель;
+    - "estimate" - оценка из метода вьюсета `estimate_count(queryset)` или
+      статистики планировщика, иначе как "cached";
+    - "none" - `count` не возвращается.
+    Клиент может отказаться от `count` параметром `count=false`.
+    """
+
+    mode_query_param = "pagination"
+    keyset_mode = "cursor"
+    keyset_class = KeysetPagination
+    count_query_param = "count"
+    count_timeout = 60
+
+    def paginate_queryset(
+        self: any,
+        queryset: QuerySet,
+        request: Request,
+        view: any = None,
+    ) -> list:
+        self.keyset = None
+        if self.use_keyset(request, view):
+            self.keyset = self.keyset_class()
+            self.record_count(view, "keyset")
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.count_mode = self.get_count_mode(request, view)
+        if self.count_mode == COUNT_EXACT:
+            self.record_count(view, "query")
+            return super().paginate_queryset(queryset, request, view)
+
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.request = request
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        page = rows[:self.limit]
+        # Нижняя граница числа записей: её достаточно, чтобы ссылки
+        # next/previous строились без COUNT(*).
+        self.count = self.offset + len(rows)
+        if self.count_mode == COUNT_NONE:
+            self.reported_count = None
+            self.record_count(view, "none")
+        elif len(rows) <= self.limit and (page or not self.offset):
+            self.reported_count = self.count
+            self.record_count(view, "page")
+        else:
+            self.reported_count = self.get_approximate_count(queryset, view)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return page
+
+    def get_paginated_response(self: any, data: list) -> Response:
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        if self.count_mode == COUNT_EXACT:
+            return super().get_paginated_response(data)
+        response = OrderedDict()
+        if self.reported_count is not None:
+            response["count"] = self.reported_count
+        response["next"] = self.get_next_link()
+        response["previous"] = self.get_previous_link()
+        response["results"] = data
+        return Response(response)
+
+    def get_count_mode(self: any, request: Request, view: any) -> str:
+        value = request.query_params.get(self.count_query_param, "")
+        if value.lower() in ("0", "false", "no"):
+            return COUNT_NONE
+        return getattr(view, "pagination_count", COUNT_EXACT)
+
+    def get_approximate_count(self: any, queryset: QuerySet, view: any) -> int:
+        if self.count_mode == COUNT_ESTIMATE:
+            estimate = None
+            if hasattr(view, "estimate_count"):
+                estimate = view.estimate_count(queryset)
+            elif isinstance(queryset, QuerySet):
+                estimate = planner_estimate(queryset)
+            if estimate is not None:
+                self.record_count(view, "estimate")
+                return max(estimate, self.count)
+        return self.get_cached_count(queryset, view)
+
+    def get_cached_count(self: any, queryset: QuerySet, view: any) -> int:
+        if not isinstance(queryset, QuerySet):
+            self.record_count(view, "query")
+            return self.get_count(queryset)
+        sql, params = queryset.order_by().query.sql_with_params()
+        key = make_key(
+            "count",
+            get_version(EPOCH_NAMESPACE),
+            get_version(model_namespace(queryset.model)),
+            sql,
+            params,
+        )
+        count = cache.get(key)
+        self.record_count(view, "cache" if count is not None else "query")
+        if count is None:
+            count = self.get_count(queryset)
+            timeout = getattr(
+                view,
+                "pagination_count_timeout",
+                self.count_timeout,
+            )
+            cache.set(key, count, timeout)
+        return count
+
+    def record_count(self: any, view: any, source: str) -> None:
+        """Учитывает способ получения count в метриках (core.metrics)."""
+        pagination_counts.inc(type(view).__name__, source)
+
+    def use_keyset(self: any, request: Request, view: any) -> bool:
+        if not getattr(view, "keyset_ordering", None):
+            return False
+        return (
+            request.query_params.get(self.mode_query_param) == self.keyset_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
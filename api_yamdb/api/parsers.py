@@ -0,0 +1,43 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from api.renderers import FastJSONRenderer, orjson
+
+UTF8_ENCODINGS = ("utf-8", "utf8")
+# orjson читает целые больше 64 бит как float, JSONParser - как int.
+# Такие числа ищутся по 19 цифрам подряд, после замены цифр на "0".
+DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+LONG_NUMBER = b"0" * 19
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser, разбирающий тело запроса через orjson.
+
+    Тела в кодировке, отличной от UTF-8, тела с длинными числами и тела,
+    которые orjson не принял, разбирает JSONParser, так что результат и
+    ошибки совпадают с ним.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(
+        self: any,
+        stream: any,
+        media_type: str = None,
+        parser_context: dict = None,
+    ) -> any:
+        encoding = (parser_context or {}).get(
+            "encoding",
+            settings.DEFAULT_CHARSET,
+        )
+        if orjson is None or encoding.lower() not in UTF8_ENCODINGS:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER in body.translate(DIGITS_TO_ZERO):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,60 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer, кодирующий ответы через orjson, если он установлен.
+
+    Вывод совпадает с JSONRenderer побайтно: компактный, с символами
+    не-ASCII без экранирования и с экранированными U+2028 и U+2029.
+    Даты и время, которые orjson записывает иначе, и другие типы, которых
+    он не знает, кодирует JSONEncoder DRF. Отличаться может запись
+    чисел с плавающей точкой в экспоненциальной форме (1e16 вместо 1e+16)
+    и порядок ключей OrderedDict, переставленных move_to_end: orjson
+    выводит ключи в порядке добавления.
+    Ответы с отступами и данные, которые orjson закодировать не может,
+    рендерит JSONRenderer.
+    """
+
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if orjson
+        else 0
+    )
+
+    def render(
+        self: any,
+        data: any,
+        accepted_media_type: str = None,
+        renderer_context: dict = None,
+    ) -> bytes:
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.options,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if LINE_SEPARATOR in content or PARAGRAPH_SEPARATOR in content:
+            content = content.replace(LINE_SEPARATOR, b"\\u2028").replace(
+                PARAGRAPH_SEPARATOR,
+                b"\\u2029",
+            )
+        return content
@@ -1,13 +1,25 @@
+from collections import OrderedDict
+
+from django.db.models import QuerySet
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
+from core.metrics import measure
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import CustomUser
 
 from .validators import check_username
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class MeasuredModelSerializer(serializers.ModelSerializer):
+    """Время вывода учитывается в метриках запроса (core.metrics)."""
+
+    def to_representation(self: any, instance: any) -> OrderedDict:
+        with measure("serializer"):
+            return super().to_representation(instance)
+
+
+class CommentSerializer(MeasuredModelSerializer):
     """Сериализатор комментариев."""
 
     author = serializers.SlugRelatedField(
@@ -20,7 +32,7 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ("text", "author", "pub_date", "id")
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(MeasuredModelSerializer):
     """Сериализатор категорий произведений."""
 
     class Meta:
@@ -28,7 +40,7 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ("name", "slug")
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(MeasuredModelSerializer):
     """Сериализатор жанров произведений."""
 
     class Meta:
@@ -36,7 +48,7 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ("name", "slug")
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(MeasuredModelSerializer):
     """Сериализатор отзывов"""
 
     author = serializers.SlugRelatedField(
@@ -60,7 +72,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(MeasuredModelSerializer):
     """Сериализатор редактирования произведений."""
 
     category = serializers.SlugRelatedField(
@@ -78,7 +90,7 @@ class TitleSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(MeasuredModelSerializer):
     """Сериализатор произведений."""
 
     category = CategorySerializer()
@@ -101,7 +113,110 @@ class TitleReadSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class CustomUserSerializer(serializers.ModelSerializer):
+class ValuesSerializer:
+    """Вывод списка объектов по строкам .values() вместо экземпляров модели.
+
+    Вывод совпадает с выводом `serializer_class`, но поля сериализатора
+    создаются один раз на список, а не на каждый объект, и из базы читаются
+    только нужные колонки. Поддерживаются поля модели (значение приводится
+    методом to_representation поля), SlugRelatedField (slug читается
+    join'ом), вложенный сериализатор связи ForeignKey (его колонки читаются
+    join'ом) и вложенный список по ManyToMany (одним запросом на страницу).
+    """
+
+    serializer_class = None
+
+    def __init__(self: any, context: dict = None) -> None:
+        self.model = self.serializer_class.Meta.model
+        self.paths = ["pk"]
+        self.columns = self.build_columns(
+            self.serializer_class(context=context).fields,
+        )
+
+    def build_columns(self: any, fields: dict, prefix: str = "") -> list:
+        """Колонки вывода: (имя, путь в .values(), вид, поле или колонки)."""
+        columns = []
+        for name, field in fields.items():
+            path = f"{prefix}{field.source}"
+            if isinstance(field, serializers.ListSerializer):
+                nested = [
+                    (name, subfield.source, "field", subfield)
+                    for name, subfield in field.child.fields.items()
+                ]
+                columns.append((name, field.source, "many", nested))
+                continue
+            if isinstance(field, serializers.BaseSerializer):
+                nested = self.build_columns(field.fields, f"{path}__")
+                columns.append((name, path, "nested", nested))
+            elif isinstance(field, serializers.SlugRelatedField):
+                path = f"{path}__{field.slug_field}"
+                columns.append((name, path, "value", None))
+            elif isinstance(field, serializers.RelatedField):
+                raise TypeError(f"Поле {name} не поддерживается")
+            else:
+                columns.append((name, path, "field", field))
+            self.paths.append(path)
+        return columns
+
+    def get_values(self: any, queryset: QuerySet) -> QuerySet:
+        return queryset.select_related(None).prefetch_related(None).values(
+            *self.paths,
+        )
+
+    def represent(self: any, row: dict, columns: list, many: dict) -> dict:
+        data = OrderedDict()
+        for name, path, kind, field in columns:
+            if kind == "many":
+                data[name] = many[name][row["pk"]]
+                continue
+            value = row[path]
+            if value is None or kind == "value":
+                data[name] = value
+            elif kind == "nested":
+                data[name] = self.represent(row, field, many)
+            else:
+                data[name] = field.to_representation(value)
+        return data
+
+    def load_many(self: any, source: str, columns: list, ids: list) -> dict:
+        """Вложенные списки связи ManyToMany `source` по id объектов."""
+        relation = self.model._meta.get_field(source)
+        query_name = relation.related_query_name()
+        related = relation.related_model.objects.filter(
+            **{f"{query_name}__in": ids},
+        ).values(query_name, *(path for _, path, _, _ in columns))
+        lists = {object_id: [] for object_id in ids}
+        for row in related:
+            lists[row[query_name]].append(self.represent(row, columns, {}))
+        return lists
+
+    def serialize(self: any, rows: list) -> list:
+        with measure("serializer"):
+            return self.serialize_rows(list(rows))
+
+    def serialize_rows(self: any, rows: list) -> list:
+        ids = [row["pk"] for row in rows]
+        many = {
+            name: self.load_many(source, columns, ids)
+            for name, source, kind, columns in self.columns
+            if kind == "many"
+        }
+        return [self.represent(row, self.columns, many) for row in rows]
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    serializer_class = CommentSerializer
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    serializer_class = ReviewSerializer
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    serializer_class = TitleReadSerializer
+
+
+class CustomUserSerializer(MeasuredModelSerializer):
     """Сериализатор пользователя."""
 
     email = serializers.EmailField(
@@ -131,7 +246,7 @@ class CustomUserSerializer(serializers.ModelSerializer):
         )
 
 
-class NotAdminUserSerializer(serializers.ModelSerializer):
+class NotAdminUserSerializer(MeasuredModelSerializer):
     """Сериализатор для пользователя с обязательным указанием роли."""
 
     username = serializers.CharField(
@@ -0,0 +1,56 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import token_versions
+from api.cache import bump_version, children_namespace, model_namespace
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import CustomUser
+
+# Обработчики подключаются только к моделям API: глобальный обработчик
+# post_delete отключил бы быстрое удаление (без выборки) для всех моделей.
+CACHED_MODELS = (Category, Genre, Title, Review, Comment)
+
+# Поле, связывающее запись с родительской: версия записей одного родителя
+# служит валидатором условных GET-запросов к вложенным ресурсам.
+PARENT_FIELDS = {Review: "title_id", Comment: "review_id"}
+CHILD_MODELS = {Title: Review, Review: Comment}
+
+
+def bump_model_version(sender: any, **kwargs: any) -> None:
+    """Сбрасывает закешированные данные изменённой модели."""
+    instance = kwargs["instance"]
+    namespaces = [model_namespace(sender)]
+    if sender in PARENT_FIELDS:
+        parent_id = getattr(instance, PARENT_FIELDS[sender])
+        namespaces.append(children_namespace(sender, parent_id))
+    if sender in CHILD_MODELS and kwargs["signal"] is post_delete:
+        # Вместе с записью каскадно удаляются её дочерние записи.
+        child = CHILD_MODELS[sender]
+        namespaces.append(children_namespace(child, instance.pk))
+    bump_version(*namespaces)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_model_version, sender=model)
+    post_delete.connect(bump_model_version, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_m2m_version(sender: any, instance: any, **kwargs: any) -> None:
+    """Изменение связей M2M меняет выборки обеих связанных моделей."""
+    if kwargs["action"].startswith("post_"):
+        bump_version(
+            model_namespace(type(instance)),
+            model_namespace(kwargs["model"]),
+        )
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def forget_token_version(
+    sender: any,
+    instance: CustomUser,
+    **kwargs: any,
+) -> None:
+    """Сбрасывает закешированную версию токенов изменённого пользователя."""
+    token_versions.forget(instance.pk)
@@ -0,0 +1,292 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_COUNTER_STORE = {"BACKEND": "api.throttling.CacheCounterStore"}
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class CounterStore(ABC):
+    """Хранилище счётчиков запросов для ограничения частоты.
+
+    Счётчик живёт ttl секунд с первого увеличения; incr должен быть
+    атомарным, если хранилищем пользуются несколько процессов.
+    """
+
+    @abstractmethod
+    def incr(self: any, key: str, ttl: int) -> int:
+        """Увеличивает счётчик, возвращает новое значение."""
+
+    @abstractmethod
+    def get(self: any, key: str) -> int:
+        """Текущее значение счётчика, 0 для истёкшего."""
+
+
+class MemoryCounterStore(CounterStore):
+    """Счётчики в памяти процесса: у каждого процесса сервера свои."""
+
+    def __init__(self: any) -> None:
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.next_cleanup = 0.0
+
+    def incr(self: any, key: str, ttl: int) -> int:
+        now = time.monotonic()
+        with self.lock:
+            if now >= self.next_cleanup:
+                self.cleanup(now)
+            count, expires = self.counters.get(key, (0, now + ttl))
+            if expires <= now:
+                count, expires = 0, now + ttl
+            self.counters[key] = (count + 1, expires)
+            return count + 1
+
+    def get(self: any, key: str) -> int:
+        with self.lock:
+            count, expires = self.counters.get(key, (0, 0.0))
+        return count if expires > time.monotonic() else 0
+
+    def cleanup(self: any, now: float) -> None:
+        self.counters = {
+            key: value
+            for key, value in self.counters.items()
+            if value[1] > now
+        }
+        self.next_cleanup = now + 60
+
+
+class CacheCounterStore(CounterStore):
+    """Счётчики в кеше Django.
+
+    Общие для процессов сервера, если кеш общий, но атомарны, только если
+    атомарен incr бэкенда кеша (Redis, Memcached). Файловый кеш читает и
+    записывает счётчик отдельно, и параллельные запросы могут превысить
+    лимит: с ним нужен SqliteCounterStore.
+    """
+
+    def incr(self: any, key: str, ttl: int) -> int:
+        if cache.add(key, 1, ttl):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Счётчик истёк между add и incr.
+            cache.add(key, 1, ttl)
+            return 1
+
+    def get(self: any, key: str) -> int:
+        return cache.get(key, 0)
+
+
+class SqliteCounterStore(CounterStore):
+    """Счётчики в отдельном файле SQLite, общем для процессов сервера.
+
+    Файл не связан с основной базой, поэтому ограничение частоты не
+    нагружает её даже при потоке отклоняемых запросов.
+    """
+
+    def __init__(self: any, path: str) -> None:
+        self.path = str(path)
+        self.local = threading.local()
+
+    def connection(self: any) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=5,
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, "
+                "expires REAL NOT NULL)",
+            )
+            self.local.connection = connection
+        return connection
+
+    def incr(self: any, key: str, ttl: int) -> int:
+        now = time.time()
+        row = self.connection().execute(
+            "INSERT INTO counters (key, count, expires) VALUES (?, 1, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "count = CASE WHEN expires > ? THEN count + 1 ELSE 1 END, "
+            "expires = CASE WHEN expires > ? THEN expires ELSE "
+            "excluded.expires END "
+            "RETURNING count",
+            (key, now + ttl, now, now),
+        ).fetchone()
+        return row[0]
+
+    def get(self: any, key: str) -> int:
+        row = self.connection().execute(
+            "SELECT count FROM counters WHERE key = ? AND expires > ?",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def purge(self: any) -> None:
+        """Удаляет истёкшие счётчики."""
+        self.connection().execute(
+            "DELETE FROM counters WHERE expires <= ?",
+            (time.time(),),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_counter_store() -> CounterStore:
+    """Хранилище из настройки THROTTLE_COUNTER_STORE."""
+    config = getattr(settings, "THROTTLE_COUNTER_STORE", DEFAULT_COUNTER_STORE)
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+def parse_rate(rate: str) -> tuple:
+    """'10/minute' -> (10, 60)."""
+    count, period = rate.split("/")
+    return int(count), DURATIONS[period[0]]
+
+
+def sliding_window_hit(
+    store: CounterStore,
+    key: str,
+    limit: int,
+    window: int,
+    now: float = None,
+) -> tuple:
+    """Учитывает запрос и проверяет лимит скользящего окна.
+
+    Окно приближается двумя соседними фиксированными окнами: запросы
+    прошлого окна учитываются с весом доли, которую оно ещё занимает в
+    скользящем. Отклонённые запросы тоже учитываются. Возвращает
+    (разрешён ли запрос, сколько секунд ждать).
+    """
+    if now is None:
+        now = time.time()
+    bucket, elapsed = divmod(now, window)
+    current = store.incr(f"{key}:{int(bucket)}", window * 2)
+    previous = store.get(f"{key}:{int(bucket) - 1}")
+    weight = 1 - elapsed / window
+    if previous * weight + current <= limit:
+        return True, 0.0
+    if current > limit or not previous:
+        return False, window - elapsed
+    # Через сколько секунд вес прошлого окна опустится до допустимого.
+    allowed_weight = (limit - current) / previous
+    return False, max(window * (weight - allowed_weight), 1.0)
+
+
+class SlidingWindowThrottle(BaseThrottle, ABC):
+    """Ограничение частоты запросов скользящим окном.
+
+    Частота берётся из атрибута `rate` или из настройки
+    DEFAULT_THROTTLE_RATES по `scope`, счётчики хранятся в хранилище
+    get_counter_store(). Проверка выполняется до обработки запроса и не
+    обращается к базе данных.
+    """
+
+    scope = None
+    rate = None
+
+    def get_rate(self: any) -> str:
+        if self.rate is not None:
+            return self.rate
+        return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+
+    @abstractmethod
+    def get_idents(self: any, request: Request) -> list:
+        """Значения, по которым считаются запросы."""
+
+    def allow_request(self: any, request: Request, view: any) -> bool:
+        limit, window = parse_rate(self.get_rate())
+        store = get_counter_store()
+        self.wait_seconds = None
+        for ident in self.get_idents(request):
+            allowed, wait = sliding_window_hit(
+                store,
+                f"throttle:{self.scope}:{ident}",
+                limit,
+                window,
+            )
+            if not allowed:
+                self.wait_seconds = wait
+                return False
+        return True
+
+    def wait(self: any) -> float:
+        return self.wait_seconds
+
+
+class IPRateThrottle(SlidingWindowThrottle):
+    """Ограничение по IP-адресу клиента.
+
+    Адрес берётся из X-Forwarded-For только с учётом NUM_PROXIES
+    доверенных прокси, иначе - из REMOTE_ADDR: подставленный клиентом
+    заголовок не сбрасывает счётчик.
+    """
+
+    def get_idents(self: any, request: Request) -> list:
+        return [self.get_ident(request)]
+
+
+class FieldRateThrottle(SlidingWindowThrottle):
+    """Ограничение по значениям полей запроса (`fields`).
+
+    В ключ счётчика попадает хеш значения: длина ключа ограничена, а
+    адреса и имена не хранятся в открытом виде. С `per_ip` значение
+    считается отдельно для каждого IP-адреса клиента: чужие запросы с тем
+    же значением не исчерпывают лимит владельца. Тело запроса, не
+    являющееся объектом, не учитывается: его отвергнет сериализатор.
+    """
+
+    fields = ()
+    per_ip = False
+
+    def get_idents(self: any, request: Request) -> list:
+        if not isinstance(request.data, Mapping):
+            return []
+        prefix = f"{self.get_ident(request)}:" if self.per_ip else ""
+        idents = []
+        for field in self.fields:
+            value = request.data.get(field)
+            if isinstance(value, str) and value.strip():
+                value = prefix + value.strip().lower()
+                digest = hashlib.md5(value.encode())
+                idents.append(f"{field}:{digest.hexdigest()}")
+        return idents
+
+
+class SignupIPThrottle(IPRateThrottle):
+    scope = "signup"
+
+
+class SignupIdentityThrottle(FieldRateThrottle):
+    scope = "signup_identity"
+    fields = ("username", "email")
+
+
+class TokenIPThrottle(IPRateThrottle):
+    scope = "token"
+
+
+class TokenIdentityThrottle(FieldRateThrottle):
+    """Подбор кода подтверждения: лимит на имя пользователя с одного IP.
+
+    Общий для всех адресов лимит позволил бы любому заблокировать
+    пользователю получение токена.
+    """
+
+    scope = "token_identity"
+    fields = ("username",)
+    per_ip = True
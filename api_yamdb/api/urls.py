@@ -6,6 +6,9 @@ from api.views import (
     CommentViewSet,
     CustomUserViewSet,
     GenreViewSet,
+    RequestProfileDetail,
+    RequestProfiles,
+    ResponseCacheStats,
     ReviewViewSet,
     Signup,
     TitleViewSet,
@@ -29,6 +32,23 @@ urlpatterns = [
     path("v1/", include(router.urls)),
     path("v1/auth/signup/", Signup.as_view(), name="signup"),
     path("v1/auth/token/", Token.as_view(), name="token"),
+    path(
+        "v1/cache/stats/",
+        ResponseCacheStats.as_view(),
+        name="response-cache-stats",
+    ),
+    path("v1/profiles/", RequestProfiles.as_view(), name="profiles"),
+    path(
+        "v1/profiles/<str:profile_id>/",
+        RequestProfileDetail.as_view(),
+        name="profile-detail",
+    ),
+    path(
+        "v1/profiles/<str:profile_id>/collapsed/",
+        RequestProfileDetail.as_view(),
+        {"collapsed": True},
+        name="profile-collapsed",
+    ),
     path("v1/titles/<int:title_id>/", include(reviews_router.urls)),
     path(
         "v1/titles/<int:title_id>/reviews/<int:review_id>/",
@@ -1,11 +1,10 @@
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.filters import SearchFilter
 from rest_framework.mixins import (
     CreateModelMixin,
@@ -22,24 +21,43 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
-from rest_framework_simplejwt.tokens import AccessToken
 
+from api.authentication import ClaimsAccessToken, load_user
+from api.cache import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    children_namespace,
+    response_cache_stats,
+)
 from api.serializers import (
     CategorySerializer,
     CommentSerializer,
+    CommentValuesSerializer,
     CustomUserSerializer,
     GenreSerializer,
     NotAdminUserSerializer,
     ReviewSerializer,
+    ReviewValuesSerializer,
     SignupSerializer,
     TitleReadSerializer,
     TitleSerializer,
+    TitleValuesSerializer,
     TokenSerializer,
 )
+from api.throttling import (
+    SignupIdentityThrottle,
+    SignupIPThrottle,
+    TokenIdentityThrottle,
+    TokenIPThrottle,
+)
+from core.mail import enqueue_mail
+from core.profiling import get_profile, list_profiles
 from reviews.models import Category, Comment, Genre, Review, Title
+from users.confirmation import consume_code, issue_code
 from users.models import CustomUser
 
 from .filters import TitlesFilter
+from .pagination import COUNT_CACHED
 from .permissions import (
     IsAdminModeratorOwnerOrReadOnly,
     IsAdminOrReadOnly,
@@ -47,13 +65,49 @@ from .permissions import (
 )
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class ValuesListMixin:
+    """Действие list через `values_serializer_class` (см. ValuesSerializer).
+
+    Остальные действия используют обычный сериализатор вьюсета.
+    """
+
+    values_serializer_class = None
+
+    def list(
+        self: any,
+        request: Request,
+        *args: any,
+        **kwargs: any,
+    ) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.values_serializer_class(
+            context=self.get_serializer_context(),
+        )
+        rows = serializer.get_values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+
+class TitleViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """Вьюсет получения списка всех произведений."""
 
-    queryset = Title.objects.annotate(rating=Avg("reviews__score")).all()
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre",
+    )
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitlesFilter
+    values_serializer_class = TitleValuesSerializer
+    keyset_ordering = ("name", "id")
+    # Рейтинг произведения меняется вместе с отзывами.
+    cache_models = (Title, Category, Genre, Review)
 
     def get_serializer_class(self: any) -> TitleSerializer:
         if self.action in ("list", "retrieve"):
@@ -61,14 +115,24 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleSerializer
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalGetMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """Вьюсет для комментариев."""
 
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAdminModeratorOwnerOrReadOnly,
     )
+    keyset_ordering = ("-pub_date", "id")
+    pagination_count = COUNT_CACHED
+
+    def get_validator_namespaces(self: any) -> list:
+        return [children_namespace(Comment, self.kwargs.get("review_id"))]
 
     def get_queryset(self: any) -> list[Comment]:
         review_id = self.kwargs.get("review_id")
@@ -82,14 +146,24 @@ class CommentViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user, review=review)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalGetMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """Вьюсет для отзывов"""
 
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAdminModeratorOwnerOrReadOnly,
     )
+    keyset_ordering = ("-pub_date", "id")
+    pagination_count = COUNT_CACHED
+
+    def get_validator_namespaces(self: any) -> list:
+        return [children_namespace(Review, self.kwargs.get("title_id"))]
 
     def get_queryset(self: any) -> list[Review]:
         title_id = self.kwargs.get("title_id")
@@ -106,6 +180,8 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
 
 class CategoryViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
     CreateModelMixin,
     ListModelMixin,
     DestroyModelMixin,
@@ -115,6 +191,7 @@ class CategoryViewSet(
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_models = (Category,)
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
     search_fields = ("name",)
@@ -122,6 +199,8 @@ class CategoryViewSet(
 
 
 class GenreViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
     CreateModelMixin,
     ListModelMixin,
     DestroyModelMixin,
@@ -131,6 +210,7 @@ class GenreViewSet(
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
     search_fields = ("name",)
@@ -161,17 +241,18 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         ],
     )
     def me(self: any, request: Request) -> Response:
-        serializer = CustomUserSerializer(request.user)
+        user = load_user(request.user)
+        serializer = CustomUserSerializer(user)
         if request.method == "PATCH":
-            if request.user.is_admin or request.user.is_superuser:
+            if user.is_admin or user.is_superuser:
                 serializer = CustomUserSerializer(
-                    request.user,
+                    user,
                     data=request.data,
                     partial=True,
                 )
             else:
                 serializer = NotAdminUserSerializer(
-                    request.user,
+                    user,
                     data=request.data,
                     partial=True,
                 )
@@ -180,10 +261,55 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class ResponseCacheStats(APIView):
+    """Счётчики попаданий и промахов кеша ответов для мониторинга."""
+
+    permission_classes = (IsAuthenticated, IsAdminPermission)
+
+    def get(self: any, request: Request) -> Response:
+        return Response(response_cache_stats(), status=status.HTTP_200_OK)
+
+
+class RequestProfiles(APIView):
+    """Последние сохранённые профили запросов (core.profiling)."""
+
+    permission_classes = (IsAuthenticated, IsAdminPermission)
+
+    def get(self: any, request: Request) -> Response:
+        return Response(list_profiles(), status=status.HTTP_200_OK)
+
+
+class RequestProfileDetail(APIView):
+    """Профиль запроса: таблица cProfile и свёрнутые стеки.
+
+    С суффиксом collapsed/ отдаются только стеки текстом в формате
+    flamegraph.pl, который понимают также speedscope и inferno.
+    """
+
+    permission_classes = (IsAuthenticated, IsAdminPermission)
+
+    def get(
+        self: any,
+        request: Request,
+        profile_id: str,
+        collapsed: bool = False,
+    ) -> Response:
+        profile = get_profile(profile_id)
+        if profile is None:
+            raise NotFound("Профиль не найден")
+        if collapsed:
+            return HttpResponse(
+                profile["collapsed"],
+                content_type="text/plain; charset=utf-8",
+            )
+        return Response(profile, status=status.HTTP_200_OK)
+
+
 class Signup(APIView):
     """Регистрация пользователя с отправкой сообщения кода пользователю."""
 
     permission_classes = (AllowAny,)
+    throttle_classes = (SignupIPThrottle, SignupIdentityThrottle)
 
     def post(self: any, request: Request) -> Response:
         serializer = SignupSerializer(data=request.data)
@@ -198,14 +324,13 @@ class Signup(APIView):
                 f"Данные уже существуют: {str(e)}",
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        confirmation_code = default_token_generator.make_token(user)
+        confirmation_code = issue_code(user)
         email = serializer.data["email"]
-        send_mail(
+        enqueue_mail(
             subject="Код для регистрации",
             message=confirmation_code,
             from_email="from@example.com",
             recipient_list=[email],
-            fail_silently=False,
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -214,25 +339,23 @@ class Token(APIView):
     """Получение токена пользователем для регистрации."""
 
     permission_classes = (AllowAny,)
+    throttle_classes = (TokenIPThrottle, TokenIdentityThrottle)
 
     def post(self: any, request: Request) -> Response:
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = get_object_or_404(
-            CustomUser,
-            username=serializer.data["username"],
-        )
-        if default_token_generator.check_token(
-            user,
+        user = consume_code(
+            serializer.data["username"],
             serializer.data["confirmation_code"],
-        ):
-            token = AccessToken.for_user(user)
+        )
+        if user is not None:
+            token = ClaimsAccessToken.for_user(user)
             return Response(
                 "Ваш токен " + str(token),
                 status=status.HTTP_200_OK,
             )
-        else:
-            return Response(
-                "Неверный код",
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        get_object_or_404(CustomUser, username=serializer.data["username"])
+        return Response(
+            "Неверный код",
+            status=status.HTTP_400_BAD_REQUEST,
+        )
@@ -12,7 +12,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv('SECRET_KEY', default='secret')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = ['*']
 
@@ -36,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,10 +45,34 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+# Бюджет запросов к базе на один запрос к серверу (core.middleware): маршруты,
+# превысившие его, попадают в журнал. QUERY_BUDGET_ROUTES задаёт отдельный
+# бюджет по имени маршрута, например {'titles-list': 5}.
+QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', 10))
+QUERY_BUDGET_ROUTES = {}
+QUERY_TIME_BUDGET_MS = float(os.getenv('QUERY_TIME_BUDGET_MS', 200))
+
+# Профилирование запросов (core.middleware.ProfilingMiddleware): при
+# PROFILE_REQUESTS=1 - запросы администраторов с заголовком X-Profile, при
+# PROFILE_SAMPLE_RATE - случайная доля всех запросов. Хранятся последние
+# PROFILE_HISTORY профилей, стек снимается каждые PROFILE_SAMPLE_INTERVAL с.
+PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS') == '1'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_HISTORY = int(os.getenv('PROFILE_HISTORY', 20))
+PROFILE_SAMPLE_INTERVAL = 0.001
+
+# Метрики процесса в формате Prometheus на /metrics (core.metrics). Адрес
+# требует заголовок Authorization: Bearer <METRICS_TOKEN>; без METRICS_TOKEN
+# он открыт только в режиме DEBUG.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
     {
@@ -76,6 +102,65 @@ DATABASES = {
     },
 }
 
+# Профиль SQLITE_PROFILE=production: журнал WAL (читатели не ждут писателей),
+# synchronous=NORMAL, отображение файла в память, кеш страниц, ожидание
+# блокировки вместо ошибки и повторное использование соединений. PRAGMA из
+# ключа PRAGMAS выполняются при каждом подключении (core.signals).
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
+}
+if os.getenv('SQLITE_PROFILE') == 'production':
+    DATABASES['default']['PRAGMAS'] = SQLITE_PRODUCTION_PRAGMAS
+    DATABASES['default']['CONN_MAX_AGE'] = int(
+        os.getenv('CONN_MAX_AGE', 600)
+    )
+
+# Реплики для чтения: DB_REPLICAS=N добавляет базы replica1..replicaN. Чтения
+# безопасных запросов к API идут в реплики, запись - в default; после записи
+# пользователь REPLICA_STICKY_SECONDS секунд читает из default (отметка в кеше
+# по JWT и подписанная cookie). Локально реплики - копии файла SQLite,
+# обновляемые командой replicate_db.
+DATABASE_REPLICAS = [
+    f'replica{number}'
+    for number in range(1, int(os.getenv('DB_REPLICAS', 0)) + 1)
+]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / f'db.{alias}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 10))
+
+# Кеш ответов API, версий данных и токенов, счётчиков ограничения частоты.
+# CACHE_BACKEND=file хранит кеш в каталоге CACHE_LOCATION, общем для
+# нескольких процессов сервера, CACHE_BACKEND=locmem - в памяти процесса.
+# Без DEBUG по умолчанию кеш файловый; кеш в памяти процесса допустим только
+# для одного процесса сервера, иначе приложение не запустится (см.
+# SERVER_PROCESSES).
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem' if DEBUG else 'file')
+# Число процессов сервера; gunicorn и uvicorn читают ту же переменную.
+SERVER_PROCESSES = int(os.getenv('WEB_CONCURRENCY', 1))
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', BASE_DIR / 'cache'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
 
 # Password validation
 
@@ -121,12 +206,50 @@ STATICFILES_STORAGE = 'static/data'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.ApiPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '30/minute',
+        'signup_identity': '10/hour',
+        'token': '30/minute',
+        'token_identity': '10/hour',
+    },
+    # Число доверенных прокси перед сервером: IP-адрес клиента берётся из
+    # X-Forwarded-For только за ними, без прокси - из REMOTE_ADDR.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
+# Хранилище счётчиков ограничения частоты запросов к регистрации и выдаче
+# токена. THROTTLE_STORE=cache - кеш Django, sqlite - отдельный файл SQLite
+# THROTTLE_LOCATION, общий для процессов сервера, memory - память процесса.
+# Файловый кеш увеличивает счётчики не атомарно, поэтому с ним по умолчанию
+# счётчики хранятся в SQLite.
+THROTTLE_STORE = os.getenv(
+    'THROTTLE_STORE', 'sqlite' if CACHE_BACKEND == 'file' else 'cache'
+)
+if THROTTLE_STORE == 'sqlite':
+    THROTTLE_COUNTER_STORE = {
+        'BACKEND': 'api.throttling.SqliteCounterStore',
+        'OPTIONS': {
+            'path': os.getenv('THROTTLE_LOCATION', BASE_DIR / 'throttle.sqlite3'),
+        },
+    }
+elif THROTTLE_STORE == 'memory':
+    THROTTLE_COUNTER_STORE = {'BACKEND': 'api.throttling.MemoryCounterStore'}
+else:
+    THROTTLE_COUNTER_STORE = {'BACKEND': 'api.throttling.CacheCounterStore'}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=14),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -134,6 +257,10 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'users.CustomUser'
 
+# Полнотекстовый поиск произведений; на СУБД, отличной от той, на которую
+# рассчитан бэкенд, используется поиск без индекса.
+TITLE_SEARCH_BACKEND = 'reviews.search.SqliteFtsSearchBackend'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.core.exceptions import ImproperlyConfigured
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self) -> None:
+        import core.signals  # noqa: F401
+        from api.cache import cache_is_shared
+
+        if not cache_is_shared():
+            raise ImproperlyConfigured(
+                'Кеш в памяти процесса (LocMemCache) не общий для '
+                'процессов сервера (WEB_CONCURRENCY > 1): кеш ответов, '
+                'версии токенов и счётчики частоты в процессах разойдутся. '
+                'Задайте CACHE_BACKEND=file или общий бэкенд кеша.',
+            )
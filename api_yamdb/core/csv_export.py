@@ -0,0 +1,208 @@
+import csv
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Model
+
+from core.csv_import import open_data_file, pool_executor
+from reviews.models import Category, Comment, CustomUser, Genre, Review, Title
+
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+
+class ExportTarget:
+    """Модель и колонки файла, в который она выгружается.
+
+    `columns` сопоставляет колонку файла с полем модели; имена файлов и
+    колонок совпадают с файлами, которые читает import_csv.
+    """
+
+    def __init__(self, filename: str, model: Model, columns: dict) -> None:
+        self.filename = filename
+        self.model = model
+        self.columns = columns
+
+    def get_path(
+        self,
+        directory: Path,
+        file_format: str,
+        compress: bool,
+    ) -> Path:
+        name = f'{Path(self.filename).stem}.{file_format}'
+        if compress:
+            name = f'{name}.gz'
+        return directory / name
+
+    def rows(self, chunk_size: int) -> any:
+        """Строки модели по возрастанию pk серверным курсором."""
+        return self.model.objects.order_by('pk').values_list(
+            *self.columns.values(),
+        ).iterator(chunk_size=chunk_size)
+
+
+TARGETS = (
+    ExportTarget(
+        'category.csv',
+        Category,
+        {'id': 'id', 'name': 'name', 'slug': 'slug'},
+    ),
+    ExportTarget(
+        'genre.csv',
+        Genre,
+        {'id': 'id', 'name': 'name', 'slug': 'slug'},
+    ),
+    ExportTarget(
+        'titles.csv',
+        Title,
+        {
+            'id': 'id',
+            'name': 'name',
+            'year': 'year',
+            'category': 'category',
+            'description': 'description',
+        },
+    ),
+    ExportTarget(
+        'users.csv',
+        CustomUser,
+        {
+            'id': 'id',
+            'username': 'username',
+            'email': 'email',
+            'role': 'role',
+            'bio': 'bio',
+            'first_name': 'first_name',
+            'last_name': 'last_name',
+        },
+    ),
+    ExportTarget(
+        'review.csv',
+        Review,
+        {
+            'id': 'id',
+            'title_id': 'title',
+            'text': 'text',
+            'author': 'author',
+            'score': 'score',
+            'pub_date': 'pub_date',
+        },
+    ),
+    ExportTarget(
+        'comments.csv',
+        Comment,
+        {
+            'id': 'id',
+            'review_id': 'review',
+            'text': 'text',
+            'author': 'author',
+            'pub_date': 'pub_date',
+        },
+    ),
+    ExportTarget(
+        'genre_title.csv',
+        Title.genre.through,
+        {'id': 'id', 'title_id': 'title', 'genre_id': 'genre'},
+    ),
+)
+
+
+def _csv_value(value: any) -> any:
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def write_csv(file: any, columns: tuple, rows: any) -> int:
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        count += 1
+    return count
+
+
+def write_jsonl(file: any, columns: tuple, rows: any) -> int:
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    count = 0
+    for row in rows:
+        file.write(encoder.encode(dict(zip(columns, row))))
+        file.write('\n')
+        count += 1
+    return count
+
+
+WRITERS = {FORMAT_CSV: write_csv, FORMAT_JSONL: write_jsonl}
+
+
+def export_target(
+    index: int,
+    directory: Path,
+    file_format: str,
+    compress: bool,
+    chunk_size: int,
+) -> tuple:
+    """Выгружает модель TARGETS[index] в файл каталога directory.
+
+    Строки пишутся во временный файл, который переименовывается после
+    записи последней строки, поэтому прерванная выгрузка не оставляет
+    обрезанных файлов. Возвращает (файл, строк, секунд).
+    """
+    target = TARGETS[index]
+    path = target.get_path(directory, file_format, compress)
+    temporary = path.with_name(f'.{path.name}.tmp')
+    started = time.monotonic()
+    with open_data_file(temporary, 'wt', compress) as file:
+        rows = WRITERS[file_format](
+            file,
+            tuple(target.columns),
+            target.rows(chunk_size),
+        )
+    os.replace(temporary, path)
+    return path.name, rows, time.monotonic() - started
+
+
+def init_worker() -> None:
+    """Готовит процесс пула к выгрузке: у каждого процесса своё соединение."""
+    import django
+
+    django.setup()
+    connections.close_all()
+
+
+def run_export(
+    directory: Path,
+    file_format: str = FORMAT_CSV,
+    compress: bool = False,
+    chunk_size: int = 2000,
+    workers: int = 1,
+) -> list:
+    """Выгружает все модели в directory, по модели на процесс пула.
+
+    Возвращает список (файл, строк, секунд) в порядке TARGETS.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    executor = pool_executor(workers, init_worker)
+    try:
+        futures = [
+            executor.submit(
+                export_target,
+                index,
+                directory,
+                file_format,
+                compress,
+                chunk_size,
+            )
+            for index in range(len(TARGETS))
+        ]
+        return [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,701 @@
+import csv
+import gzip
+import json
+import logging
+import multiprocessing
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Model
+from django.utils import timezone
+
+from api.cache import EPOCH_NAMESPACE, bump_version, model_namespace
+from core.models import ImportCheckpoint
+from reviews.models import Category, Comment, CustomUser, Genre, Review, Title
+from reviews.ratings import recalculate_ratings
+from reviews.search import get_search_backend
+
+logger = logging.getLogger(__name__)
+
+
+def is_null(value: any) -> bool:
+    """Пустое значение: None в JSON Lines, пустая строка в CSV."""
+    return value is None or value == ''
+
+
+def auto_now_fields(model: Model) -> list:
+    return [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+
+
+@contextmanager
+def keep_dates(model: Model):
+    """Сохраняет даты из файла в полях с auto_now_add.
+
+    Иначе bulk_create заменяет их текущим временем.
+    """
+    fields = auto_now_fields(model)
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class IdMap:
+    """Множество id модели, уже присутствующих в базе.
+
+    Загружается одним запросом при первом обращении и пополняется id
+    вставленных строк, поэтому внешние ключи проверяются без запросов.
+    """
+
+    def __init__(self, model: Model) -> None:
+        self.model = model
+        self._ids = None
+
+    def load(self) -> set:
+        if self._ids is None:
+            self._ids = set(
+                self.model.objects.values_list('pk', flat=True).iterator(),
+            )
+        return self._ids
+
+    def __contains__(self, pk: int) -> bool:
+        return pk in self.load()
+
+    def update(self, ids: any) -> None:
+        # Незагруженная карта прочитает новые id из базы при обращении.
+        if self._ids is not None:
+            self._ids.update(ids)
+
+
+class IdMaps(dict):
+    """Карты id, создаваемые по мере обращения к моделям."""
+
+    def __missing__(self, model: Model) -> IdMap:
+        self[model] = IdMap(model)
+        return self[model]
+
+
+class CsvSource:
+    """CSV-файл и правила переноса его колонок в поля модели.
+
+    `columns` сопоставляет колонку файла с полем модели, `references` -
+    колонку с моделью, на id которой она ссылается. Пачки файла
+    сохраняются независимо друг от друга, в любом порядке.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        model: Model,
+        columns: dict,
+        references: dict = None,
+        message: str = '',
+    ) -> None:
+        self.filename = filename
+        self.model = model
+        self.columns = columns
+        self.references = references or {}
+        self.message = message
+
+    def prepare(self, id_maps: dict) -> None:
+        """Загружает карты id моделей, на которые ссылается файл.
+
+        Вызывается до транзакции пачки: в SQLite транзакция, начавшаяся с
+        чтения, не может дождаться блокировки на запись и сразу падает с
+        «database is locked», если пишет другой процесс.
+        """
+        for model in self.references.values():
+            id_maps[model].load()
+
+    def check_references(self, row: dict, number: int, id_maps: dict) -> None:
+        for column, model in self.references.items():
+            if is_null(row[column]):
+                continue
+            if int(row[column]) not in id_maps[model]:
+                raise CommandError(
+                    f'{self.filename}, запись {number}: не найден '
+                    f'{model._meta.verbose_name} с id={row[column]}',
+                )
+
+    def build(self, row: dict, number: int, id_maps: dict) -> Model:
+        """Объект модели из строки файла.
+
+        Колонки, которых нет в файле, получают значения полей по умолчанию;
+        пустое значение nullable-поля (так выгружается None) - это None.
+        """
+        self.check_references(row, number, id_maps)
+        values = {}
+        for column, field in self.columns.items():
+            if column not in row:
+                continue
+            value = row[column]
+            if is_null(value) and self.model._meta.get_field(field).null:
+                value = None
+            values[field] = value
+        for field in auto_now_fields(self.model):
+            if is_null(values.get(field.attname)):
+                values[field.attname] = timezone.now()
+        return self.model(**values)
+
+    def present(self, ids: list) -> set:
+        return set(
+            self.model.objects.filter(pk__in=ids).values_list('pk', flat=True),
+        )
+
+    def existing(self, rows: list) -> set:
+        """id строк пачки, которые уже есть в базе.
+
+        Читаются до транзакции пачки по той же причине, что и в prepare.
+        """
+        pk = self.model._meta.pk
+        column = next(
+            column for column, field in self.columns.items()
+            if field == pk.attname
+        )
+        return self.present([pk.to_python(row[column]) for row in rows])
+
+    def load(
+        self,
+        rows: list,
+        first_number: int,
+        id_maps: dict,
+        existing: set = frozenset(),
+    ) -> int:
+        """Сохраняет строки пачки, возвращает число вставленных.
+
+        bulk_create с ignore_conflicts молча пропускает строки, нарушающие
+        уникальность (уже загруженный id, занятое имя пользователя),
+        поэтому вставленными считаются id, которых до пачки не было в
+        базе (`existing`), а после неё - появились.
+        """
+        objects = [
+            self.build(row, number, id_maps)
+            for number, row in enumerate(rows, first_number)
+        ]
+        with keep_dates(self.model):
+            self.model.objects.bulk_create(objects, ignore_conflicts=True)
+        pk = self.model._meta.pk
+        inserted = self.present(
+            [pk.to_python(obj.pk) for obj in objects],
+        ) - existing
+        id_maps[self.model].update(inserted)
+        return len(inserted)
+
+
+class LinkSource(CsvSource):
+    """Связи многие-ко-многим.
+
+    Пары id из пачки собираются без повторов и вставляются в промежуточную
+    таблицу одним запросом; уже существующие связи пропускаются и не
+    считаются вставленными, поэтому пачки можно сохранять в любом порядке.
+    """
+
+    def pairs(self, rows: list) -> set:
+        return {
+            tuple(int(row[column]) for column in self.columns)
+            for row in rows
+        }
+
+    def existing(self, rows: list) -> set:
+        pairs = self.pairs(rows)
+        fields = tuple(self.columns.values())
+        return pairs & set(
+            self.model.objects.filter(**{
+                f'{fields[0]}__in': {pair[0] for pair in pairs},
+            }).values_list(*fields),
+        )
+
+    def load(
+        self,
+        rows: list,
+        first_number: int,
+        id_maps: dict,
+        existing: set = frozenset(),
+    ) -> int:
+        for number, row in enumerate(rows, first_number):
+            self.check_references(row, number, id_maps)
+        pairs = self.pairs(rows) - existing
+        fields = tuple(self.columns.values())
+        self.model.objects.bulk_create(
+            (self.model(**dict(zip(fields, pair))) for pair in pairs),
+            ignore_conflicts=True,
+        )
+        return len(pairs)
+
+
+SOURCES = (
+    CsvSource(
+        'category.csv',
+        Category,
+        {'id': 'id', 'name': 'name', 'slug': 'slug'},
+        message='Категории импортированы',
+    ),
+    CsvSource(
+        'genre.csv',
+        Genre,
+        {'id': 'id', 'name': 'name', 'slug': 'slug'},
+        message='Жанры импортированы',
+    ),
+    CsvSource(
+        'titles.csv',
+        Title,
+        {
+            'id': 'id',
+            'name': 'name',
+            'year': 'year',
+            'category': 'category_id',
+            'description': 'description',
+        },
+        references={'category': Category},
+        message='Произведения импортированы',
+    ),
+    CsvSource(
+        'users.csv',
+        CustomUser,
+        {
+            'id': 'id',
+            'username': 'username',
+            'email': 'email',
+            'role': 'role',
+            'bio': 'bio',
+            'first_name': 'first_name',
+            'last_name': 'last_name',
+        },
+        message='Пользователи импортированы',
+    ),
+    CsvSource(
+        'review.csv',
+        Review,
+        {
+            'id': 'id',
+            'title_id': 'title_id',
+            'text': 'text',
+            'author': 'author_id',
+            'score': 'score',
+            'pub_date': 'pub_date',
+        },
+        references={'title_id': Title, 'author': CustomUser},
+        message='Отзывы импортированы',
+    ),
+    CsvSource(
+        'comments.csv',
+        Comment,
+        {
+            'id': 'id',
+            'review_id': 'review_id',
+            'text': 'text',
+            'author': 'author_id',
+            'pub_date': 'pub_date',
+        },
+        references={'review_id': Review, 'author': CustomUser},
+        message='Комментарии импортированы',
+    ),
+    LinkSource(
+        'genre_title.csv',
+        Title.genre.through,
+        {'title_id': 'title_id', 'genre_id': 'genre_id'},
+        references={'title_id': Title, 'genre_id': Genre},
+        message='Жанры в произведения импортированы',
+    ),
+)
+
+
+DATA_SUFFIXES = ('.csv', '.csv.gz', '.jsonl', '.jsonl.gz')
+
+
+def open_data_file(
+    path: Path,
+    mode: str = 'rt',
+    compress: bool = None,
+) -> any:
+    """Открывает файл данных как текст; .gz-файлы - через gzip."""
+    if compress is None:
+        compress = path.suffix == '.gz'
+    if compress:
+        return gzip.open(path, mode, encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def find_data_file(directory: Path, filename: str) -> Path:
+    """Файл данных для filename: CSV или JSON Lines, сжатый или нет."""
+    stem = Path(filename).stem
+    for suffix in DATA_SUFFIXES:
+        path = directory / f'{stem}{suffix}'
+        if path.exists():
+            return path
+    raise CommandError(f'В каталоге {directory} нет файла {filename}')
+
+
+def read_chunks(path: Path, size: int, offset: int = 0) -> any:
+    """Читает файл данных потоком, отдавая пачки по size строк.
+
+    Вместе с пачкой отдаёт позицию в файле сразу после её последней строки:
+    с неё можно продолжить чтение, передав её в offset. csv.reader берёт
+    строки файла по одной и только по мере надобности, поэтому позиция
+    файла после пачки указывает ровно на начало следующей записи.
+    Файлы JSON Lines (.jsonl) содержат по объекту в строке и без заголовка.
+    """
+    with open_data_file(path) as file:
+        jsonl = '.jsonl' in path.suffixes
+        header = None if jsonl else next(csv.reader([file.readline()]))
+        if offset:
+            file.seek(offset)
+        lines = iter(file.readline, '')
+        if jsonl:
+            reader = (json.loads(line) for line in lines if line.strip())
+        else:
+            reader = csv.DictReader(lines, fieldnames=header)
+        while True:
+            chunk = list(islice(reader, size))
+            if not chunk:
+                return
+            yield chunk, file.tell()
+
+
+def load_chunk(index: int, rows: list, first_number: int) -> tuple:
+    """Сохраняет пачку строк файла SOURCES[index] в отдельной транзакции.
+
+    Выполняется как в основном процессе, так и в процессах пула, поэтому
+    получает описание файла по индексу, а карты id - из состояния процесса.
+    Возвращает (вставлено строк, пропущено строк).
+    """
+    source = SOURCES[index]
+    id_maps = _worker_state['id_maps']
+    source.prepare(id_maps)
+    existing = source.existing(rows)
+    with transaction.atomic():
+        inserted = source.load(rows, first_number, id_maps, existing)
+    return inserted, len(rows) - inserted
+
+
+_worker_state = {'id_maps': IdMaps()}
+
+
+def init_worker() -> None:
+    """Готовит процесс пула к загрузке пачек.
+
+    Основной процесс пишет контрольные точки, поэтому к моменту запуска
+    очередного процесса пула у него может быть открыто соединение с БД:
+    процесс пула закрывает унаследованную копию и открывает своё.
+    """
+    import django
+
+    django.setup()
+    connections.close_all()
+    _worker_state['id_maps'] = IdMaps()
+
+
+class InlineExecutor:
+    """Исполнитель, выполняющий задачи сразу в текущем процессе."""
+
+    def submit(self, function: any, *args: any) -> Future:
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except BaseException as error:
+            future.set_exception(error)
+        return future
+
+    def shutdown(self, *args: any, **kwargs: any) -> None:
+        pass
+
+
+def pool_executor(workers: int, initializer: any) -> any:
+    """Пул из workers процессов или InlineExecutor при workers <= 1.
+
+    Процессы пула запускаются через fork: они наследуют настройки и
+    открытую ими базу, в том числе тестовую. Где fork недоступен (Windows),
+    работа выполняется в текущем процессе с сообщением об ошибке.
+    """
+    if workers <= 1:
+        return InlineExecutor()
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        logger.error(
+            'Запуск процессов через fork недоступен на этой платформе: '
+            'параметр --workers %s не действует, данные обрабатываются в '
+            'одном процессе.',
+            workers,
+        )
+        return InlineExecutor()
+    # Процессы пула не должны наследовать открытые соединения.
+    connections.close_all()
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('fork'),
+        initializer=initializer,
+    )
+
+
+def dependencies(sources: tuple) -> dict:
+    """Граф зависимостей: файл -> файлы моделей, на которые он ссылается."""
+    owners = {source.model: source.filename for source in sources}
+    return {
+        source.filename: {
+            owners[model]
+            for model in source.references.values()
+            if model in owners
+        }
+        for source in sources
+    }
+
+
+class FileProgress:
+    """Ход загрузки одного файла в планировщике.
+
+    Пачки могут сохраняться не по порядку, поэтому контрольная точка
+    сдвигается только до конца непрерывного ряда сохранённых пачек.
+    """
+
+    def __init__(self, index: int, source: CsvSource) -> None:
+        self.index = index
+        self.source = source
+        self.checkpoint = None
+        self.chunks = None
+        self.exhausted = False
+        self.next_number = 1
+        self.pending = 0
+        self.rows = 0
+        self.skipped = 0
+        self.chunk_ends = {}
+        self.saved_numbers = set()
+        self.started = None
+        self.seconds = 0.0
+
+    def start(
+        self,
+        directory: Path,
+        batch_size: int,
+        checkpoint: ImportCheckpoint,
+    ) -> None:
+        self.checkpoint = checkpoint
+        self.started = time.monotonic()
+        if checkpoint.completed:
+            self.chunks = iter(())
+            return
+        self.next_number = checkpoint.rows + 1
+        self.chunks = read_chunks(
+            find_data_file(directory, self.source.filename),
+            batch_size,
+            checkpoint.offset,
+        )
+
+    @property
+    def finished(self) -> bool:
+        return self.exhausted and not self.pending
+
+    def can_submit(self) -> bool:
+        return self.chunks is not None and not self.exhausted
+
+    def next_chunk(self) -> tuple:
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            return None
+        rows, end_offset = chunk
+        number = self.next_number
+        self.next_number += len(rows)
+        self.chunk_ends[number] = (len(rows), end_offset)
+        return rows, number
+
+    def chunk_saved(self, number: int) -> bool:
+        """Отмечает пачку сохранённой.
+
+        Возвращает True, если сдвинулась контрольная точка файла.
+        """
+        self.saved_numbers.add(number)
+        moved = False
+        while self.checkpoint.rows + 1 in self.saved_numbers:
+            self.saved_numbers.remove(self.checkpoint.rows + 1)
+            rows, end_offset = self.chunk_ends.pop(self.checkpoint.rows + 1)
+            self.checkpoint.rows += rows
+            self.checkpoint.offset = end_offset
+            moved = True
+        return moved
+
+
+def finish_import(sources: tuple) -> None:
+    """Приводит базу в согласованное состояние после массовой вставки.
+
+    bulk_create не вызывает сигналы и не сдвигает последовательности
+    первичных ключей, поэтому рейтинги, поисковый индекс, последовательности
+    и версии закешированных данных API обновляются отдельно.
+    """
+    models = [source.model for source in sources]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+        recalculate_ratings()
+        get_search_backend().rebuild()
+    bump_version(
+        EPOCH_NAMESPACE,
+        *(model_namespace(model) for model in models),
+    )
+
+
+class ImportScheduler:
+    """Планировщик загрузки файлов с учётом зависимостей между ними.
+
+    Файл начинает загружаться, когда сохранены все файлы, на которые он
+    ссылается; независимые файлы и пачки одного файла отдаются исполнителю
+    параллельно, не более `max_pending` пачек одновременно.
+    """
+
+    def __init__(
+        self,
+        executor: any,
+        directory: Path,
+        batch_size: int,
+        max_pending: int,
+        report: any,
+        resume: bool = False,
+    ) -> None:
+        self.executor = executor
+        self.directory = directory
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.report = report
+        self.resume = resume
+        self.graph = dependencies(SOURCES)
+        self.progress = {
+            source.filename: FileProgress(index, source)
+            for index, source in enumerate(SOURCES)
+        }
+        self.futures = {}
+        self.done_files = set()
+
+    def run(self) -> list:
+        while len(self.done_files) < len(self.progress):
+            self.start_ready_files()
+            self.submit_chunks()
+            self.collect()
+            self.finish_files()
+        return [
+            (filename, file.rows, file.skipped, file.seconds)
+            for filename, file in self.progress.items()
+        ]
+
+    def start_ready_files(self) -> None:
+        for filename, file in self.progress.items():
+            if file.chunks is None and self.graph[filename] <= self.done_files:
+                file.start(
+                    self.directory,
+                    self.batch_size,
+                    self.get_checkpoint(filename),
+                )
+
+    def get_checkpoint(self, filename: str) -> ImportCheckpoint:
+        """Контрольная точка файла; без resume или после изменения файла
+        загрузка начинается с начала."""
+        file_size = find_data_file(self.directory, filename).stat().st_size
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            filename=filename,
+        )
+        if not self.resume or checkpoint.file_size != file_size:
+            checkpoint.file_size = file_size
+            checkpoint.rows = checkpoint.offset = 0
+            checkpoint.completed = False
+            checkpoint.save()
+        return checkpoint
+
+    def submit_chunks(self) -> None:
+        submitted = True
+        while submitted:
+            submitted = False
+            for file in self.progress.values():
+                if len(self.futures) >= self.max_pending:
+                    return
+                chunk = file.next_chunk() if file.can_submit() else None
+                if chunk is None:
+                    continue
+                future = self.executor.submit(load_chunk, file.index, *chunk)
+                self.futures[future] = (file, chunk[1])
+                file.pending += 1
+                submitted = True
+
+    def collect(self) -> None:
+        completed = [future for future in self.futures if future.done()]
+        if not completed and self.futures:
+            completed, _ = wait(self.futures, return_when=FIRST_COMPLETED)
+        for future in completed:
+            file, number = self.futures.pop(future)
+            file.pending -= 1
+            inserted, skipped = future.result()
+            file.rows += inserted
+            file.skipped += skipped
+            if file.chunk_saved(number):
+                file.checkpoint.save(update_fields=(
+                    'rows',
+                    'offset',
+                    'updated_at',
+                ))
+
+    def finish_files(self) -> None:
+        for filename, file in self.progress.items():
+            if filename not in self.done_files and file.finished:
+                file.seconds = time.monotonic() - file.started
+                file.checkpoint.completed = True
+                file.checkpoint.save(update_fields=('completed', 'updated_at'))
+                self.done_files.add(filename)
+                self.report(
+                    file.source.message,
+                    file.rows,
+                    file.seconds,
+                    file.skipped,
+                )
+
+
+def run_import(
+    directory: Path,
+    batch_size: int,
+    report: any,
+    workers: int = 1,
+    resume: bool = False,
+) -> list:
+    """Импортирует csv-файлы из directory в `workers` процессах.
+
+    С resume продолжает загрузку с контрольных точек прошлого запуска.
+    Возвращает список (файл, вставлено строк, пропущено строк, секунд) для
+    итоговой сводки; пропущены строки, которые уже были в базе или
+    нарушили уникальность.
+    """
+    _worker_state['id_maps'] = IdMaps()
+    executor = pool_executor(workers, init_worker)
+    started = time.monotonic()
+    scheduler = ImportScheduler(
+        executor,
+        directory,
+        batch_size,
+        max(workers * 2, 1),
+        report,
+        resume,
+    )
+    try:
+        stats = scheduler.run()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    finish_import(SOURCES)
+    report(
+        'Импорт завершён',
+        sum(rows for _, rows, _, _ in stats),
+        time.monotonic() - started,
+        sum(skipped for _, _, skipped, _ in stats),
+    )
+    return stats
@@ -0,0 +1,155 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+
+RETRY_DELAY = 60
+MAX_RETRY_DELAY = 3600
+# Время, на которое письма пачки закрепляются за отправляющим процессом:
+# пока оно не истекло, другие процессы их не берут.
+LEASE = timedelta(minutes=5)
+
+
+def enqueue_mail(
+    subject: str,
+    message: str,
+    from_email: str,
+    recipient_list: list,
+) -> OutgoingEmail:
+    """Ставит письмо в очередь на отправку (аналог send_mail)."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=list(recipient_list),
+        next_attempt_at=timezone.now(),
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Экспоненциальная задержка перед повторной отправкой."""
+    return timedelta(
+        seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY),
+    )
+
+
+def claim_batch(batch_size: int, max_attempts: int) -> list:
+    """Закрепляет за процессом пачку писем, которые пора отправить."""
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=now,
+        attempts__lt=max_attempts,
+    )
+    ids = list(
+        due.order_by("next_attempt_at", "id").values_list("id", flat=True)[
+            :batch_size
+        ],
+    )
+    if not ids:
+        return []
+    lease_until = now + LEASE
+    due.filter(pk__in=ids).update(next_attempt_at=lease_until)
+    # Письма, которые другой процесс закрепил раньше, сюда не попадут.
+    return list(
+        OutgoingEmail.objects.filter(
+            pk__in=ids,
+            next_attempt_at=lease_until,
+        ).order_by("id"),
+    )
+
+
+class OutboxSender:
+    """Отправляет письма из очереди пачками через одно соединение.
+
+    Соединение с почтовым сервером открывается при первой пачке и
+    используется для всех следующих; после ошибки оно переоткрывается.
+    """
+
+    def __init__(self, batch_size: int = 100, max_attempts: int = 5) -> None:
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.connection = None
+
+    def open(self) -> None:
+        if self.connection is None:
+            self.connection = get_connection()
+            self.connection.open()
+
+    def close(self) -> None:
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            connection.close()
+
+    def close_quietly(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def send_batch(self) -> tuple:
+        """Отправляет одну пачку, возвращает (отправлено, с ошибкой)."""
+        emails = claim_batch(self.batch_size, self.max_attempts)
+        sent, failed = [], []
+        for email in emails:
+            try:
+                self.open()
+                EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=email.recipients,
+                    connection=self.connection,
+                ).send()
+            except Exception as error:
+                email.attempts += 1
+                email.last_error = f"{type(error).__name__}: {error}"
+                email.next_attempt_at = (
+                    timezone.now() + retry_delay(email.attempts)
+                )
+                failed.append(email)
+                # Следующее письмо пойдёт через новое соединение.
+                self.close_quietly()
+            else:
+                sent.append(email.pk)
+        OutgoingEmail.objects.filter(pk__in=sent).update(
+            sent_at=timezone.now(),
+            attempts=F("attempts") + 1,
+            last_error="",
+        )
+        OutgoingEmail.objects.bulk_update(
+            failed,
+            ["attempts", "last_error", "next_attempt_at"],
+        )
+        return len(sent), len(failed)
+
+    def drain(self, loop: bool = False, interval: float = 5.0) -> tuple:
+        """Отправляет пачки, пока очередь не опустеет (с loop - бесконечно).
+
+        Возвращает суммарные (отправлено, с ошибкой).
+        """
+        total_sent = total_failed = 0
+        try:
+            while True:
+                sent, failed = self.send_batch()
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    continue
+                if not loop:
+                    return total_sent, total_failed
+                time.sleep(interval)
+        finally:
+            self.close()
+
+
+def pending_count(max_attempts: int) -> int:
+    """Число писем, которые ещё будут отправляться."""
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=max_attempts,
+    ).count()
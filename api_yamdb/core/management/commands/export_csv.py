@@ -0,0 +1,63 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.csv_export import FORMAT_CSV, FORMATS, run_export
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка данных в файлы, которые читает import_csv'
+
+    def add_arguments(self, parser: any) -> None:
+        parser.add_argument(
+            '--path',
+            type=Path,
+            default=settings.BASE_DIR / 'export',
+            help='Каталог для выгружаемых файлов',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=FORMAT_CSV,
+            help='Формат файлов: csv или jsonl (JSON Lines)',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Количество строк, читаемых из базы за один раз',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для параллельной выгрузки моделей',
+        )
+
+    def handle(self, *args: any, **options: any) -> None:
+        started = time.monotonic()
+        stats = run_export(
+            options['path'],
+            options['format'],
+            options['gzip'],
+            options['chunk_size'],
+            options['workers'],
+        )
+        for filename, rows, seconds in stats:
+            self.stdout.write(
+                f'  {filename:<24} {rows:>10} строк {seconds:>8.2f} с',
+            )
+        rows = sum(rows for _, rows, _ in stats)
+        seconds = time.monotonic() - started
+        speed = rows / seconds if seconds else rows
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгрузка завершена: {rows} строк за {seconds:.2f} с '
+            f'({speed:.0f} строк/с)',
+        ))
@@ -1,106 +1,68 @@
-import csv
+from pathlib import Path
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.shortcuts import get_object_or_404
 
-from reviews.models import Category, Comment, CustomUser, Genre, Review, Title
+from core.csv_import import run_import
 
 
 class Command(BaseCommand):
     help = 'Импорт данных из csv'
 
-    def handle(self, *args: any, **options: any) -> None:
-        with open('static/data/category.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                name = row['name']
-                slug = row['slug']
-                self.stdout.write(self.style.SUCCESS(row))
-                Category.objects.get_or_create(name=name, slug=slug)
-            self.stdout.write(self.style.SUCCESS('Категории импортированы'))
-
-        with open('static/data/genre.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                name = row['name']
-                slug = row['slug']
-                self.stdout.write(self.style.SUCCESS(row))
-                Genre.objects.get_or_create(name=name, slug=slug)
-            self.stdout.write(self.style.SUCCESS('Жанры импортированы'))
-
-        with open('static/data/titles.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                name = row['name']
-                year = row['year']
-                category = get_object_or_404(Category, id=row['category'])
-
-                Title.objects.get_or_create(
-                    name=name,
-                    year=year,
-                    category=category,
-                )
-                self.stdout.write(self.style.SUCCESS(row))
-            self.stdout.write(self.style.SUCCESS('Произведения импортированы'))
-
-        with open('static/data/users.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                id = row['id']
-                username = row['username']
-                email = row['email']
-                role = row['role']
-                first_name = row['first_name']
-                last_name = row['last_name']
-                self.stdout.write(self.style.SUCCESS(row))
-                CustomUser.objects.get_or_create(
-                    id=id,
-                    username=username,
-                    email=email,
-                    role=role,
-                    first_name=first_name,
-                    last_name=last_name,
-                )
-            self.stdout.write(self.style.SUCCESS('Пользователи импортированы'))
+    def add_arguments(self, parser: any) -> None:
+        parser.add_argument(
+            '--path',
+            type=Path,
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='Каталог с csv-файлами',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк, сохраняемых в одной транзакции',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для параллельной загрузки',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить прерванный импорт с контрольных точек',
+        )
 
-        with open('static/data/review.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                text = row['text']
-                author = CustomUser.objects.get(id=row['author'])
-                title = get_object_or_404(Title, id=row['title_id'])
-                Review.objects.get_or_create(
-                    title=title,
-                    text=text,
-                    author=author,
-                )
-                self.stdout.write(self.style.SUCCESS(row))
-            self.stdout.write(self.style.SUCCESS('Отзывы импортированы'))
-
-        with open('static/data/comments.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                review = Review.objects.get(id=row['review_id'])
-                text = row['text']
-                author = CustomUser.objects.get(id=row['author'])
-                pub_date = row['pub_date']
-                Comment.objects.get_or_create(
-                    review=review,
-                    text=text,
-                    author=author,
-                    pub_date=pub_date,
-                )
-                self.stdout.write(self.style.SUCCESS(row))
-            self.stdout.write(self.style.SUCCESS('Комментарии импортированы'))
-
-        with open('static/data/genre_title.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                genre = get_object_or_404(Genre, id=row['genre_id'])
-                title = get_object_or_404(Title, id=row['title_id'])
-                title.genre.set([genre])
-                title.save()
-                self.stdout.write(self.style.SUCCESS(row))
+    def handle(self, *args: any, **options: any) -> None:
+        stats = run_import(
+            options['path'],
+            options['batch_size'],
+            self.report,
+            workers=options['workers'],
+            resume=options['resume'],
+        )
+        self.stdout.write('Время загрузки по файлам:')
+        for filename, rows, skipped, seconds in stats:
             self.stdout.write(
-                self.style.SUCCESS('Жанры в произведения импортированы'),
+                f'  {filename:<20} {rows:>10} строк {skipped:>10} пропущено '
+                f'{seconds:>8.2f} с',
             )
+
+    def report(
+        self,
+        message: str,
+        rows: int,
+        seconds: float,
+        skipped: int = 0,
+    ) -> None:
+        speed = rows / seconds if seconds else rows
+        self.stdout.write(self.style.SUCCESS(
+            f'{message}: {rows} строк за {seconds:.2f} с '
+            f'({speed:.0f} строк/с)',
+        ))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'  пропущено {skipped} строк: записи с такими id или '
+                f'уникальными полями уже есть в базе',
+            ))
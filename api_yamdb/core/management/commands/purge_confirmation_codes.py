@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from users.confirmation import purge_expired_codes
+
+
+class Command(BaseCommand):
+    help = 'Удаление истёкших кодов подтверждения'
+
+    def handle(self, *args: any, **options: any) -> None:
+        deleted = purge_expired_codes()
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено истёкших кодов: {deleted}'),
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import bump_version, model_namespace
+from reviews.models import Title
+from reviews.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестроение поискового индекса произведений'
+
+    def handle(self, *args: any, **options: any) -> None:
+        with transaction.atomic():
+            indexed = get_search_backend().rebuild()
+        # Результаты поиска в закешированных ответах API устарели.
+        bump_version(model_namespace(Title))
+        self.stdout.write(
+            self.style.SUCCESS(f'Произведений в индексе: {indexed}'),
+        )
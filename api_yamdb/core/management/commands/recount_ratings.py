@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.cache import bump_version, model_namespace
+from reviews.models import Title
+from reviews.ratings import find_rating_mismatches, recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт и проверка сохранённых рейтингов произведений'
+
+    def add_arguments(self, parser: any) -> None:
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинги, не изменяя их',
+        )
+
+    def handle(self, *args: any, **options: any) -> None:
+        if not options['check']:
+            with transaction.atomic():
+                updated = recalculate_ratings()
+            # Рейтинги в закешированных ответах API устарели.
+            bump_version(model_namespace(Title))
+            self.stdout.write(
+                self.style.SUCCESS(f'Рейтинги пересчитаны: {updated}'),
+            )
+        mismatches = find_rating_mismatches()
+        for title_id, rating_sum, count, expected_sum, expected in mismatches:
+            self.stderr.write(
+                f'Произведение {title_id}: сохранено {rating_sum}/{count}, '
+                f'по отзывам {expected_sum}/{expected}',
+            )
+        if mismatches:
+            raise CommandError(
+                f'Расхождений в рейтингах: {len(mismatches)}',
+            )
+        self.stdout.write(self.style.SUCCESS('Рейтинги сходятся с отзывами'))
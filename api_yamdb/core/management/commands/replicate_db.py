@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replication import replicate
+from core.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = 'Копирование основной базы SQLite в реплики для чтения'
+
+    def add_arguments(self, parser: any) -> None:
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, повторяя копирование',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Пауза в секундах между копированиями',
+        )
+
+    def handle(self, *args: any, **options: any) -> None:
+        replicas = replica_aliases()
+        if not replicas:
+            raise CommandError('Реплики не настроены (DB_REPLICAS)')
+        try:
+            replicate(options['loop'], options['interval'])
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Реплики обновлены: {", ".join(replicas)}',
+        ))
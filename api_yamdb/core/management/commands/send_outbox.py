@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from core.mail import OutboxSender, pending_count
+
+
+class Command(BaseCommand):
+    help = 'Отправка писем из очереди'
+
+    def add_arguments(self, parser: any) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем, отправляемых за одну пачку',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Количество попыток отправить письмо',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, ожидая новые письма',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Пауза в секундах между проверками пустой очереди',
+        )
+
+    def handle(self, *args: any, **options: any) -> None:
+        sender = OutboxSender(options['batch_size'], options['max_attempts'])
+        sent, failed = sender.drain(options['loop'], options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {sent}, с ошибкой: {failed}, '
+            f'в очереди: {pending_count(options["max_attempts"])}',
+        ))
@@ -0,0 +1,248 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+registry = []
+
+
+def escape(value: any) -> str:
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{escape(value)}"' for name, value in zip(names, values)
+    )
+    return f'{{{pairs}}}'
+
+
+class Metric(ABC):
+    """Метрика процесса в текстовом формате Prometheus.
+
+    Значения хранятся по кортежам значений меток в порядке `labels`.
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values = {}
+        self.lock = Lock()
+        registry.append(self)
+
+    @abstractmethod
+    def samples(self) -> list:
+        """Строки вида (суффикс имени, метки, значение)."""
+
+    def render(self) -> str:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f'{self.name}{suffix}{labels} {value!r}')
+        return '\n'.join(lines) + '\n'
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> list:
+        with self.lock:
+            values = sorted(self.values.items())
+        return [
+            ('', format_labels(self.labels, labels), value)
+            for labels, value in values
+        ]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                ]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self) -> list:
+        with self.lock:
+            values = sorted(
+                (labels, list(counts), total)
+                for labels, (counts, total) in self.values.items()
+            )
+        samples = []
+        names = (*self.labels, 'le')
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                bound = bound if bound == '+Inf' else float(bound)
+                samples.append((
+                    '_bucket',
+                    format_labels(names, (*labels, bound)),
+                    cumulative,
+                ))
+            plain = format_labels(self.labels, labels)
+            samples.append(('_sum', plain, total))
+            samples.append(('_count', plain, cumulative))
+        return samples
+
+
+requests_total = Counter(
+    'yamdb_http_requests_total',
+    'Запросы к серверу по маршрутам, методам и кодам ответа.',
+    ('view', 'method', 'status'),
+)
+request_duration = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'Время обработки запроса.',
+    ('view', 'method'),
+)
+db_queries = Histogram(
+    'yamdb_db_queries_per_request',
+    'Число запросов к базе на один запрос к серверу.',
+    ('view',),
+    QUERY_COUNT_BUCKETS,
+)
+db_duration = Histogram(
+    'yamdb_db_duration_seconds',
+    'Суммарное время запросов к базе за один запрос к серверу.',
+    ('view',),
+)
+serializer_duration = Histogram(
+    'yamdb_serializer_duration_seconds',
+    'Время вывода сериализаторов за один запрос к серверу.',
+    ('view',),
+)
+pagination_counts = Counter(
+    'yamdb_pagination_count_total',
+    'Страницы списков по способу получения count.',
+    ('view', 'source'),
+)
+auth_lookups = Counter(
+    'yamdb_auth_token_version_lookups_total',
+    'Проверки версии токена по месту, где найдена версия.',
+    ('source',),
+)
+
+
+class RequestMetrics:
+    """Время отдельных этапов одного запроса к серверу."""
+
+    __slots__ = ('timings', 'measuring')
+
+    def __init__(self) -> None:
+        self.timings = {}
+        self.measuring = set()
+
+
+request_metrics = ContextVar('request_metrics', default=None)
+
+
+@contextmanager
+def collect_metrics():
+    metrics = RequestMetrics()
+    token = request_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        request_metrics.reset(token)
+
+
+@contextmanager
+def measure(stage: str):
+    """Добавляет время блока к этапу stage текущего запроса.
+
+    Вложенные измерения того же этапа (вложенные сериализаторы) не
+    учитываются повторно.
+    """
+    metrics = request_metrics.get()
+    if metrics is None or stage in metrics.measuring:
+        yield
+        return
+    metrics.measuring.add(stage)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.measuring.discard(stage)
+        metrics.timings[stage] = (
+            metrics.timings.get(stage, 0.0) + time.perf_counter() - started
+        )
+
+
+def record_request(
+    view: str,
+    method: str,
+    status: int,
+    duration: float,
+    queries: any,
+    metrics: RequestMetrics,
+) -> None:
+    requests_total.inc(view, method, str(status))
+    request_duration.observe(duration, view, method)
+    db_queries.observe(queries.count, view)
+    db_duration.observe(queries.duration, view)
+    if 'serializer' in metrics.timings:
+        serializer_duration.observe(metrics.timings['serializer'], view)
+
+
+def render_response_cache() -> str:
+    from api.cache import response_cache_stats
+
+    name = 'yamdb_response_cache_total'
+    lines = [
+        f'# HELP {name} Попадания и промахи кеша ответов API.',
+        f'# TYPE {name} counter',
+    ]
+    for viewset, events in sorted(response_cache_stats().items()):
+        for event, value in sorted(events.items()):
+            labels = format_labels(('viewset', 'result'), (viewset, event))
+            lines.append(f'{name}{labels} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_metrics() -> str:
+    """Все метрики процесса в текстовом формате Prometheus."""
+    return ''.join(
+        [metric.render() for metric in registry] + [render_response_cache()]
+    )
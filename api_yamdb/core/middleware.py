@@ -0,0 +1,213 @@
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from core.metrics import collect_metrics, record_request
+from core.profiling import RequestProfiler
+from core.queries import collect_queries
+from core.routers import database_routing, replica_aliases
+
+logger = logging.getLogger(__name__)
+
+STICKY_KEY = 'db:sticky:{}'
+STICKY_COOKIE = 'primary_db'
+STICKY_SALT = 'core.middleware.ReplicaRoutingMiddleware'
+PROFILE_HEADER = 'X-Profile'
+UNMATCHED_VIEW = 'unmatched'
+REPLICA_PATH_PREFIX = '/api/'
+
+
+def token_user_id(request: any) -> any:
+    """Идентификатор пользователя из JWT в заголовке, без запроса к базе."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+        return token[api_settings.USER_ID_CLAIM]
+    except (AuthenticationFailed, KeyError):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтения безопасных запросов к API в реплики.
+
+    Пользователь, изменивший данные, следующие REPLICA_STICKY_SECONDS
+    секунд читает из основной базы, чтобы видеть свои изменения до того,
+    как они дойдут до реплик. Отметка об этом хранится в общем кеше по
+    пользователю из JWT (кеш в памяти с несколькими процессами сервера
+    отвергает CoreConfig.ready). Дополнительно клиент получает подписанную
+    cookie с временем выдачи: она действует и для запросов без токена.
+    """
+
+    def __init__(self, get_response: any) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: any) -> any:
+        if not replica_aliases():
+            return self.get_response(request)
+        user_id = token_user_id(request)
+        use_replica = (
+            request.method in SAFE_METHODS
+            and request.path.startswith(REPLICA_PATH_PREFIX)
+            and not self.sticky(request, user_id)
+        )
+        with database_routing(use_replica) as state:
+            response = self.get_response(request)
+        if state.wrote:
+            if user_id is not None:
+                cache.set(
+                    STICKY_KEY.format(user_id),
+                    True,
+                    settings.REPLICA_STICKY_SECONDS,
+                )
+            response.set_signed_cookie(
+                STICKY_COOKIE,
+                '1',
+                salt=STICKY_SALT,
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def sticky(self, request: any, user_id: any) -> bool:
+        """Писал ли клиент в последние REPLICA_STICKY_SECONDS секунд."""
+        if user_id is not None and cache.get(STICKY_KEY.format(user_id)):
+            return True
+        return request.get_signed_cookie(
+            STICKY_COOKIE,
+            default=None,
+            salt=STICKY_SALT,
+            max_age=settings.REPLICA_STICKY_SECONDS,
+        ) is not None
+
+
+class QueryBudgetMiddleware:
+    """Считает запросы к базе и их время для каждого запроса к серверу.
+
+    Маршруты, превысившие QUERY_BUDGET запросов (или бюджет маршрута из
+    QUERY_BUDGET_ROUTES) либо QUERY_TIME_BUDGET_MS миллисекунд, попадают
+    в журнал. В режиме DEBUG статистика отдаётся заголовком Server-Timing.
+    """
+
+    def __init__(self, get_response: any) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: any) -> any:
+        with collect_queries() as stats:
+            response = self.get_response(request)
+        milliseconds = stats.duration * 1000
+        match = request.resolver_match
+        route = match.view_name if match else request.path
+        budget = settings.QUERY_BUDGET_ROUTES.get(route, settings.QUERY_BUDGET)
+        if (
+            stats.count > budget
+            or milliseconds > settings.QUERY_TIME_BUDGET_MS
+        ):
+            logger.warning(
+                '%s %s: запросов к базе %d (бюджет %d), %.1f мс',
+                request.method,
+                route,
+                stats.count,
+                budget,
+                milliseconds,
+            )
+        if settings.DEBUG:
+            timing = f'db;dur={milliseconds:.1f};desc="{stats.count} queries"'
+            if response.has_header('Server-Timing'):
+                timing = f'{response["Server-Timing"]}, {timing}'
+            response['Server-Timing'] = timing
+        return response
+
+
+def is_admin_request(request: any) -> bool:
+    """Запрос администратора: по сессии или по токену JWT."""
+    from api.authentication import ClaimsJWTAuthentication
+
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            authenticated = ClaimsJWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        if authenticated is None:
+            return False
+        user = authenticated[0]
+    return user.is_admin
+
+
+class ProfilingMiddleware:
+    """Профилирование отдельных запросов (core.profiling).
+
+    При PROFILE_REQUESTS профилируются запросы администраторов с заголовком
+    X-Profile, при PROFILE_SAMPLE_RATE - случайная доля всех запросов.
+    Идентификатор сохранённого профиля возвращается в заголовке X-Profile-Id.
+    Если оба способа выключены, middleware не подключается.
+    """
+
+    def __init__(self, get_response: any) -> None:
+        if not settings.PROFILE_REQUESTS and not settings.PROFILE_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def should_profile(self, request: any) -> bool:
+        if random.random() < settings.PROFILE_SAMPLE_RATE:
+            return True
+        return (
+            settings.PROFILE_REQUESTS
+            and PROFILE_HEADER in request.headers
+            and is_admin_request(request)
+        )
+
+    def __call__(self, request: any) -> any:
+        if not self.should_profile(request):
+            return self.get_response(request)
+        with RequestProfiler() as profiler:
+            response = self.get_response(request)
+        response['X-Profile-Id'] = profiler.save(
+            request,
+            response.status_code,
+        )
+        return response
+
+
+class MetricsMiddleware:
+    """Метрики запросов по маршрутам для /metrics (core.metrics).
+
+    Считает запросы, время ответа, число и время запросов к базе и время
+    сериализаторов. Запросы без маршрута учитываются под одним именем,
+    чтобы случайные адреса не плодили серии метрик.
+    """
+
+    def __init__(self, get_response: any) -> None:
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: any) -> any:
+        started = time.perf_counter()
+        with collect_queries() as queries, collect_metrics() as metrics:
+            response = self.get_response(request)
+        match = request.resolver_match
+        record_request(
+            match.view_name if match else UNMATCHED_VIEW,
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+            queries,
+            metrics,
+        )
+        return response
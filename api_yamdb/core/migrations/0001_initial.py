@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255, unique=True, verbose_name='файл')),
+                ('file_size', models.PositiveBigIntegerField(default=0, verbose_name='размер файла')),
+                ('rows', models.PositiveBigIntegerField(default=0, verbose_name='загружено строк')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='позиция в файле')),
+                ('completed', models.BooleanField(default=False, verbose_name='загружен полностью')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='обновлено')),
+            ],
+            options={
+                'verbose_name': 'контрольная точка импорта',
+                'verbose_name_plural': 'контрольные точки импорта',
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import models
+
+
+class ImportCheckpoint(models.Model):
+    """Сохранённый ход импорта csv-файла для продолжения после сбоя."""
+
+    filename = models.CharField("файл", max_length=255, unique=True)
+    file_size = models.PositiveBigIntegerField("размер файла", default=0)
+    rows = models.PositiveBigIntegerField("загружено строк", default=0)
+    offset = models.PositiveBigIntegerField("позиция в файле", default=0)
+    completed = models.BooleanField("загружен полностью", default=False)
+    updated_at = models.DateTimeField("обновлено", auto_now=True)
+
+    class Meta:
+        verbose_name = "контрольная точка импорта"
+        verbose_name_plural = "контрольные точки импорта"
+
+    def __str__(self: any) -> str:
+        return self.filename
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Запрос только ставит письмо в очередь, отправляет его команда
+    send_outbox. Письмо, которое не удалось отправить, повторяется
+    не раньше next_attempt_at.
+    """
+
+    subject = models.CharField("тема", max_length=255)
+    body = models.TextField("текст")
+    from_email = models.CharField("отправитель", max_length=254)
+    recipients = models.JSONField("получатели")
+    created_at = models.DateTimeField("создано", auto_now_add=True)
+    next_attempt_at = models.DateTimeField("следующая попытка")
+    attempts = models.PositiveSmallIntegerField("попыток", default=0)
+    last_error = models.TextField("последняя ошибка", blank=True)
+    sent_at = models.DateTimeField("отправлено", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "исходящее письмо"
+        verbose_name_plural = "исходящие письма"
+        indexes = [
+            models.Index(
+                fields=["sent_at", "next_attempt_at"],
+                name="core_outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self: any) -> str:
+        return self.subject
@@ -0,0 +1,138 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+PROFILE_KEY = 'profiling:profile:{}'
+INDEX_KEY = 'profiling:index'
+STATS_LINES = 40
+
+
+def frame_name(frame: any) -> str:
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{frame.f_code.co_name}'.replace(';', ':')
+
+
+def collapse_stack(frame: any) -> str:
+    """Стек кадра от корня к вершине, через `;` (формат flamegraph.pl)."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """Снимает стек потока thread_id каждые interval секунд.
+
+    Поток выборки получает GIL не чаще, чем его отдаёт поток запроса
+    (sys.getswitchinterval, 5 мс), поэтому стеки коротких запросов
+    снимаются реже, чем задано interval.
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def stop(self) -> Counter:
+        self.stopped.set()
+        self.join()
+        return self.stacks
+
+
+class RequestProfiler:
+    """Профиль обработки одного запроса в текущем потоке.
+
+    cProfile даёт таблицу функций по суммарному времени, а выборка стеков
+    потока - свёрнутые стеки для flamegraph. Запросы ASGI, представления
+    которых выполняются в пуле потоков, профилируются только в части,
+    выполненной в потоке middleware.
+    """
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(
+            threading.get_ident(),
+            settings.PROFILE_SAMPLE_INTERVAL,
+        )
+
+    def __enter__(self) -> 'RequestProfiler':
+        self.started = time.perf_counter()
+        self.sampler.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info: any) -> None:
+        self.profile.disable()
+        self.stacks = self.sampler.stop()
+        self.duration = time.perf_counter() - self.started
+
+    def collapsed(self) -> str:
+        return ''.join(
+            f'{stack} {count}\n'
+            for stack, count in sorted(self.stacks.items())
+        )
+
+    def stats(self) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(STATS_LINES)
+        return stream.getvalue()
+
+    def save(self, request: any, status_code: int) -> str:
+        """Сохраняет профиль среди последних PROFILE_HISTORY, возвращает id."""
+        profile_id = uuid.uuid4().hex
+        cache.set(PROFILE_KEY.format(profile_id), {
+            'id': profile_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': status_code,
+            'duration_ms': round(self.duration * 1000, 3),
+            'created': time.time(),
+            'samples': sum(self.stacks.values()),
+            'stats': self.stats(),
+            'collapsed': self.collapsed(),
+        }, None)
+        index = [profile_id, *cache.get(INDEX_KEY, [])]
+        history = settings.PROFILE_HISTORY
+        cache.set(INDEX_KEY, index[:history], None)
+        cache.delete_many(
+            [PROFILE_KEY.format(stale) for stale in index[history:]],
+        )
+        return profile_id
+
+
+def get_profile(profile_id: str) -> dict:
+    return cache.get(PROFILE_KEY.format(profile_id))
+
+
+def list_profiles() -> list:
+    """Последние профили, новые первыми, без таблицы и стеков."""
+    profiles = cache.get_many([
+        PROFILE_KEY.format(profile_id)
+        for profile_id in cache.get(INDEX_KEY, [])
+    ])
+    summaries = [
+        {
+            key: value for key, value in profile.items()
+            if key not in ('stats', 'collapsed')
+        }
+        for profile in profiles.values()
+    ]
+    return sorted(summaries, key=lambda profile: -profile['created'])
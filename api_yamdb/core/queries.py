@@ -0,0 +1,57 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class QueryStats:
+    """Количество и суммарное время запросов к базе.
+
+    Статистика вложенного сбора учитывается и во внешнем (`parent`).
+    """
+
+    __slots__ = ('count', 'duration', 'parent')
+
+    def __init__(self, parent: 'QueryStats' = None) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.parent = parent
+
+
+query_stats = ContextVar('query_stats', default=None)
+
+
+def record_query(
+    execute: any,
+    sql: str,
+    params: any,
+    many: bool,
+    context: dict,
+) -> any:
+    """Обёртка выполнения запросов (execute_wrapper) для сбора статистики."""
+    stats = query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats = stats.parent
+
+
+@contextmanager
+def collect_queries():
+    """Считает запросы ко всем базам, выполненные в этом контексте.
+
+    Контекст переносится в потоки sync_to_async, поэтому учитываются и
+    запросы представлений, выполняемых под ASGI в пуле потоков.
+    """
+    stats = QueryStats(query_stats.get())
+    token = query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats.reset(token)
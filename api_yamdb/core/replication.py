@@ -0,0 +1,39 @@
+import sqlite3
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api.cache import EPOCH_NAMESPACE, bump_version
+from core.routers import replica_aliases
+
+
+def copy_to_replica(alias: str) -> None:
+    """Копирует основную базу SQLite в файл реплики целиком.
+
+    Заменяет настоящую репликацию при локальном запуске: копия делается
+    через резервное копирование SQLite и согласована на момент начала.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    if primary.vendor != 'sqlite' or connections[alias].vendor != 'sqlite':
+        raise ValueError('Копировать можно только базы SQLite')
+    primary.ensure_connection()
+    target = sqlite3.connect(connections[alias].settings_dict['NAME'], 30)
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
+
+
+def replicate(loop: bool = False, interval: float = 5.0) -> None:
+    """Обновляет все реплики; с loop - каждые interval секунд.
+
+    После копирования закешированные ответы API сбрасываются: их могли
+    построить по устаревшей реплике уже после изменения данных.
+    """
+    while True:
+        for alias in replica_aliases():
+            copy_to_replica(alias)
+        bump_version(EPOCH_NAMESPACE)
+        if not loop:
+            return
+        time.sleep(interval)
@@ -0,0 +1,79 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+class RoutingState:
+    """Выбор базы для чтения в пределах одного запроса.
+
+    `replica` - псевдоним реплики для чтения или None, если запрос читает
+    основную базу. После первой записи `wrote` становится истинным, и
+    дальнейшие чтения этого запроса тоже идут в основную базу.
+    """
+
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self, replica: str = None) -> None:
+        self.replica = replica
+        self.wrote = False
+
+
+routing_state = ContextVar('routing_state', default=None)
+
+
+def replica_aliases() -> list:
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+@contextmanager
+def database_routing(use_replica: bool):
+    """Состояние маршрутизации на время запроса.
+
+    При use_replica чтения уходят в случайно выбранную реплику, иначе
+    в основную базу.
+    """
+    replicas = replica_aliases()
+    replica = random.choice(replicas) if use_replica and replicas else None
+    state = RoutingState(replica)
+    token = routing_state.set(state)
+    try:
+        yield state
+    finally:
+        routing_state.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Чтение из реплик, запись в основную базу.
+
+    Вне запросов (команды, shell) и в запросах, не переключённых на
+    реплики, маршрутизатор не вмешивается и все запросы идут в default.
+    """
+
+    def db_for_read(self, model: any, **hints: any) -> str:
+        state = routing_state.get()
+        if state is None:
+            return None
+        if state.replica is None or state.wrote:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model: any, **hints: any) -> str:
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: any, obj2: any, **hints: any) -> bool:
+        aliases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, **hints: any) -> bool:
+        # Схема реплик копируется вместе с данными (replicate_db).
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,37 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.queries import record_query
+
+
+def pragma_statements(pragmas: dict) -> list:
+    """Команды PRAGMA для настроек вида {'journal_mode': 'wal'}."""
+    statements = []
+    for name, value in pragmas.items():
+        if not name.isidentifier():
+            raise ValueError(f'Неверное имя PRAGMA: {name}')
+        if not str(value).replace('-', '', 1).isalnum():
+            raise ValueError(f'Неверное значение PRAGMA {name}: {value}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender: any, connection: any, **kwargs: any) -> None:
+    """Выполняет PRAGMA из ключа PRAGMAS настроек базы при подключении."""
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    for statement in pragma_statements(pragmas):
+        connection.connection.execute(statement)
+
+
+@receiver(connection_created)
+def install_query_counter(
+    sender: any,
+    connection: any,
+    **kwargs: any,
+) -> None:
+    """Подключает сбор статистики запросов (core.queries) к соединению."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from core.metrics import CONTENT_TYPE, render_metrics
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Метрики процесса сервера в текстовом формате Prometheus.
+
+    Без METRICS_TOKEN адрес открыт только в режиме DEBUG, иначе его нет.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(
+        request.headers.get('Authorization', ''),
+        f'Bearer {settings.METRICS_TOKEN}',
+    ):
+        return HttpResponse(status=403)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
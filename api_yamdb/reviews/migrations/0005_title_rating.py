@@ -0,0 +1,51 @@
+# Generated by Django 3.2 on 2026-10-18 11:35
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_title_rating(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+
+    def scores(aggregate):
+        return Subquery(
+            Review.objects.filter(title=OuterRef('pk'), score__isnull=False)
+            .order_by()
+            .values('title')
+            .annotate(value=aggregate)
+            .values('value'),
+        )
+
+    Title.objects.using(schema_editor.connection.alias).update(
+        rating_sum=Coalesce(scores(Sum('score')), 0),
+        rating_count=Coalesce(scores(Count('score')), 0),
+        rating=scores(Avg('score')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_auto_20230516_2257'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_rating, migrations.RunPython.noop),
+    ]
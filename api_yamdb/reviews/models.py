@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from users.models import CustomUser
 
@@ -39,6 +39,9 @@ class Genre(CommonAbstact):
         verbose_name_plural = "жанры"
 
 
+RATING_FIELDS = ("rating_sum", "rating_count", "rating")
+
+
 class Title(models.Model):
     """Модель произведения."""
 
@@ -66,15 +69,58 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        "сумма оценок",
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        "количество оценок",
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        "рейтинг",
+        null=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
         ordering = ["name"]
+        # Список упорядочен по названию, в том числе после фильтров по
+        # году и категории.
+        indexes = [
+            models.Index(fields=["name", "id"], name="title_name_idx"),
+            models.Index(fields=["year", "name"], name="title_year_name_idx"),
+            models.Index(
+                fields=["category", "name"],
+                name="title_category_name_idx",
+            ),
+        ]
 
     def __str__(self: any) -> str:
         return self.name
 
+    def save(self: any, *args: any, **kwargs: any) -> None:
+        """Сохраняет произведение, не трогая полей рейтинга.
+
+        Рейтинг меняют только выражения F() при изменении отзывов; запись
+        значений, прочитанных до этого, затёрла бы их. Отложенные поля
+        (only, defer) тоже не сохраняются, как и в Model.save.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RATING_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class Review(models.Model):
     """Отзыв на произведение."""
@@ -111,10 +157,38 @@ class Review(models.Model):
             ),
         ]
         ordering = ["-pub_date"]
+        # Отзывы произведения в порядке списка и курсора (-pub_date, id).
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
 
     def __str__(self: any) -> str:
         return self.text
 
+    @classmethod
+    def from_db(cls: any, db: str, field_names: list, values: list) -> any:
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating = instance.rating_values()
+        return instance
+
+    def rating_values(self: any) -> tuple:
+        """Пара (произведение, оценка), учтённая в рейтинге произведения.
+
+        Возвращает None, если одно из полей не загружено из базы.
+        """
+        if {"title_id", "score"} - self.__dict__.keys():
+            return None
+        return self.title_id, self.score
+
+    def save(self: any, *args: any, **kwargs: any) -> None:
+        # Рейтинг произведения обновляется в post_save, поэтому запись
+        # отзыва и счётчиков должна попасть в одну транзакцию.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Комментарии к отзыву на произведение."""
@@ -133,11 +207,17 @@ class Comment(models.Model):
     pub_date = models.DateTimeField(
         "дата публикации",
         auto_now_add=True,
-        db_index=True,
     )
 
     class Meta:
         ordering = ["-pub_date"]
+        # Комментарии к отзыву в порядке списка и курсора (-pub_date, id).
+        indexes = [
+            models.Index(
+                fields=["review", "-pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
 
     def __str__(self: any) -> str:
         return self.text
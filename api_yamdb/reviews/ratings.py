@@ -0,0 +1,103 @@
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+
+from reviews.models import Review, Title
+
+
+def change_title_rating(
+    title_id: int,
+    score_delta: int,
+    count_delta: int,
+) -> None:
+    """Атомарно сдвигает сумму и количество оценок произведения.
+
+    Все выражения вычисляются из значений строки до обновления, поэтому
+    параллельные изменения отзывов не теряют друг друга.
+    """
+    if title_id is None or (score_delta == 0 and count_delta == 0):
+        return
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F("rating_sum") + score_delta,
+        rating_count=F("rating_count") + count_delta,
+        rating=Case(
+            When(rating_count=-count_delta, then=Value(None)),
+            default=(
+                Cast(F("rating_sum") + score_delta, FloatField())
+                / (F("rating_count") + count_delta)
+            ),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def add_score(title_id: int, score: int) -> None:
+    """Учитывает оценку отзыва в рейтинге произведения."""
+    if score is not None:
+        change_title_rating(title_id, score, 1)
+
+
+def remove_score(title_id: int, score: int) -> None:
+    """Исключает оценку отзыва из рейтинга произведения."""
+    if score is not None:
+        change_title_rating(title_id, -score, -1)
+
+
+def _scores(aggregate: any) -> Subquery:
+    return Subquery(
+        Review.objects.filter(title=OuterRef("pk"), score__isnull=False)
+        .order_by()
+        .values("title")
+        .annotate(value=aggregate)
+        .values("value"),
+    )
+
+
+def expected_ratings(titles: QuerySet = None) -> QuerySet:
+    """Произведения с рейтингом, посчитанным заново по отзывам."""
+    if titles is None:
+        titles = Title.objects.all()
+    return titles.annotate(
+        expected_sum=Coalesce(_scores(Sum("score")), 0),
+        expected_count=Coalesce(_scores(Count("score")), 0),
+    )
+
+
+def recalculate_ratings(titles: QuerySet = None) -> int:
+    """Пересчитывает сохранённый рейтинг произведений по их отзывам."""
+    if titles is None:
+        titles = Title.objects.all()
+    return titles.update(
+        rating_sum=Coalesce(_scores(Sum("score")), 0),
+        rating_count=Coalesce(_scores(Count("score")), 0),
+        rating=_scores(Avg("score")),
+    )
+
+
+def find_rating_mismatches(titles: QuerySet = None) -> list:
+    """Произведения, у которых сохранённый рейтинг расходится с отзывами."""
+    return list(
+        expected_ratings(titles)
+        .exclude(
+            rating_sum=F("expected_sum"),
+            rating_count=F("expected_count"),
+        )
+        .values_list(
+            "id",
+            "rating_sum",
+            "rating_count",
+            "expected_sum",
+            "expected_count",
+        )
+    )
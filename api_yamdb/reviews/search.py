@@ -0,0 +1,143 @@
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from reviews.models import Title
+
+DEFAULT_SEARCH_BACKEND = "reviews.search.SqliteFtsSearchBackend"
+
+
+def search_words(query: str) -> list:
+    return re.findall(r"\w+", query.lower())
+
+
+class TitleSearchBackend(ABC):
+    """Интерфейс полнотекстового поиска произведений.
+
+    Бэкенд отбирает произведения по запросу и упорядочивает их по
+    релевантности, а также поддерживает свой индекс в актуальном
+    состоянии. `vendor` - СУБД, с которой работает бэкенд (None - любая).
+    """
+
+    vendor = None
+
+    @abstractmethod
+    def search(self: any, queryset: QuerySet, query: str) -> QuerySet:
+        """Произведения queryset, подходящие под query, по релевантности."""
+
+    def update(self: any, titles: list) -> None:
+        """Добавляет произведения в индекс или обновляет их."""
+
+    def remove(self: any, title_ids: list) -> None:
+        """Удаляет произведения из индекса."""
+
+    def rebuild(self: any) -> int:
+        """Перестраивает индекс целиком, возвращает число произведений."""
+        return 0
+
+
+class ContainsSearchBackend(TitleSearchBackend):
+    """Поиск без индекса: каждое слово запроса ищется в названии."""
+
+    def search(self: any, queryset: QuerySet, query: str) -> QuerySet:
+        words = search_words(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(name__icontains=word)
+        return queryset
+
+
+class SqliteFtsSearchBackend(TitleSearchBackend):
+    """Поиск по индексу SQLite FTS5.
+
+    Индекс - виртуальная таблица `reviews_title_fts` (создаётся миграцией),
+    rowid строки равен id произведения. Слова запроса ищутся по префиксу,
+    результаты упорядочиваются по bm25: совпадение в названии весит больше
+    совпадения в описании.
+    """
+
+    vendor = "sqlite"
+    table = "reviews_title_fts"
+    weights = (10.0, 1.0)
+
+    def search(self: any, queryset: QuerySet, query: str) -> QuerySet:
+        words = search_words(query)
+        if not words:
+            return queryset.none()
+        match = " ".join(f'"{word}"*' for word in words)
+        weights = ", ".join(str(weight) for weight in self.weights)
+        matched = RawSQL(
+            f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s",
+            (match,),
+        )
+        rank = RawSQL(
+            f"SELECT bm25({self.table}, {weights}) FROM {self.table} "
+            f"WHERE {self.table} MATCH %s "
+            f"AND rowid = {Title._meta.db_table}.id",
+            (match,),
+        )
+        return (
+            queryset.filter(pk__in=matched)
+            .annotate(search_rank=rank)
+            .order_by("search_rank", "name", "id")
+        )
+
+    def update(self: any, titles: list) -> None:
+        titles = list(titles)
+        if not titles:
+            return
+        self.remove([title.pk for title in titles])
+        with self.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, name, description) "
+                "VALUES (%s, %s, %s)",
+                [
+                    (title.pk, title.name, title.description or "")
+                    for title in titles
+                ],
+            )
+
+    def remove(self: any, title_ids: list) -> None:
+        if not title_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(title_ids))
+        with self.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})",
+                list(title_ids),
+            )
+
+    def rebuild(self: any) -> int:
+        with self.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, name, description) "
+                "SELECT id, name, COALESCE(description, '') "
+                f"FROM {Title._meta.db_table}",
+            )
+            return cursor.rowcount
+
+    def cursor(self: any) -> any:
+        return connections[router.db_for_write(Title)].cursor()
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> TitleSearchBackend:
+    """Бэкенд из настройки TITLE_SEARCH_BACKEND.
+
+    Если бэкенд рассчитан на другую СУБД, используется поиск без индекса.
+    """
+    backend = import_string(
+        getattr(settings, "TITLE_SEARCH_BACKEND", DEFAULT_SEARCH_BACKEND),
+    )()
+    vendor = connections[router.db_for_write(Title)].vendor
+    if backend.vendor not in (None, vendor):
+        return ContainsSearchBackend()
+    return backend
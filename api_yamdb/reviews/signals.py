@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Review, Title
+from reviews.ratings import add_score, recalculate_ratings, remove_score
+from reviews.search import get_search_backend
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(
+    sender: any,
+    instance: Review,
+    created: bool,
+    **kwargs: any,
+) -> None:
+    """Обновляет рейтинг произведения при создании и изменении отзыва."""
+    loaded = getattr(instance, "_loaded_rating", None)
+    current = instance.rating_values()
+    if created:
+        add_score(*current)
+    elif loaded is None or current is None:
+        # Прежняя оценка неизвестна: отзыв сохранён без загрузки из базы.
+        recalculate_ratings(Title.objects.filter(pk=instance.title_id))
+    elif loaded != current:
+        remove_score(*loaded)
+        add_score(*current)
+    instance._loaded_rating = instance.rating_values()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(
+    sender: any,
+    instance: Review,
+    **kwargs: any,
+) -> None:
+    """Исключает оценку удалённого отзыва из рейтинга произведения."""
+    loaded = getattr(instance, "_loaded_rating", None)
+    if loaded is not None:
+        remove_score(*loaded)
+    else:
+        recalculate_ratings(Title.objects.filter(pk=instance.title_id))
+
+
+@receiver(post_save, sender=Title)
+def update_search_index(sender: any, instance: Title, **kwargs: any) -> None:
+    """Обновляет произведение в поисковом индексе."""
+    get_search_backend().update([instance])
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_search_index(
+    sender: any,
+    instance: Title,
+    **kwargs: any,
+) -> None:
+    """Удаляет произведение из поискового индекса."""
+    get_search_backend().remove([instance.pk])
@@ -0,0 +1,82 @@
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from users.models import ConfirmationCode, CustomUser
+
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 8
+
+
+def code_lifetime() -> timedelta:
+    return getattr(
+        settings,
+        "CONFIRMATION_CODE_LIFETIME",
+        timedelta(hours=1),
+    )
+
+
+def hash_code(code: str) -> str:
+    return hashlib.sha256(code.strip().upper().encode()).hexdigest()
+
+
+def issue_code(user: CustomUser) -> str:
+    """Выдаёт пользователю новый код, заменяя прежний.
+
+    Код записывается UPDATE, а при его отсутствии - INSERT, без чтения в
+    транзакции: в SQLite транзакция, начавшаяся с чтения, не дожидается
+    блокировки на запись и падает при параллельных регистрациях.
+    """
+    code = "".join(
+        secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH)
+    )
+    values = {
+        "code_hash": hash_code(code),
+        "expires_at": timezone.now() + code_lifetime(),
+    }
+    codes = ConfirmationCode.objects.filter(user=user)
+    if not codes.update(**values):
+        try:
+            ConfirmationCode.objects.create(user=user, **values)
+        except IntegrityError:
+            # Код создан параллельным запросом: заменяем его своим.
+            codes.update(**values)
+    return code
+
+
+def consume_code(username: str, code: str) -> CustomUser:
+    """Проверяет и гасит код пользователя username.
+
+    Код ищется одним запросом по индексу имени пользователя и удаляется
+    условным DELETE: из параллельных запросов с одним кодом пройдёт только
+    один. Возвращает пользователя или None, если код неверен или истёк.
+    """
+    confirmation = (
+        ConfirmationCode.objects.select_related("user")
+        .filter(user__username=username, expires_at__gt=timezone.now())
+        .first()
+    )
+    if confirmation is None or not secrets.compare_digest(
+        confirmation.code_hash,
+        hash_code(str(code)),
+    ):
+        return None
+    deleted, _ = ConfirmationCode.objects.filter(
+        pk=confirmation.pk,
+        code_hash=confirmation.code_hash,
+    ).delete()
+    if not deleted:
+        return None
+    return confirmation.user
+
+
+def purge_expired_codes() -> int:
+    """Удаляет истёкшие коды одним запросом, возвращает их число."""
+    deleted, _ = ConfirmationCode.objects.filter(
+        expires_at__lte=timezone.now(),
+    ).delete()
+    return deleted
@@ -12,6 +12,10 @@ class UserRole(models.TextChoices):
 class CustomUser(AbstractUser):
     """Модель пользователя"""
 
+    # Поля, которые передаются в токене доступа: их изменение отзывает
+    # выданные ранее токены (см. token_version).
+    CLAIM_FIELDS = ("username", "role", "is_superuser", "is_active")
+
     bio = models.TextField("биография", blank=True)
     role = models.CharField(
         "роль пользователя",
@@ -37,9 +41,48 @@ class CustomUser(AbstractUser):
         null=True,
     )
 
+    token_version = models.PositiveIntegerField(
+        "версия токенов",
+        default=0,
+        editable=False,
+    )
+
     def __str__(self: any) -> str:
         return self.username
 
+    @classmethod
+    def from_db(
+        cls: any,
+        db: str,
+        field_names: list,
+        values: list,
+    ) -> "CustomUser":
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_claims = instance.claim_values()
+        return instance
+
+    def claim_values(self: any) -> tuple:
+        """Значения полей токена; None, если часть полей не загружена."""
+        if set(self.CLAIM_FIELDS) - self.__dict__.keys():
+            return None
+        return tuple(getattr(self, field) for field in self.CLAIM_FIELDS)
+
+    def save(self: any, *args: any, **kwargs: any) -> None:
+        loaded = getattr(self, "_loaded_claims", None)
+        if loaded is not None and loaded != self.claim_values():
+            self.token_version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "token_version"}
+        super().save(*args, **kwargs)
+        self._loaded_claims = self.claim_values()
+
+    def revoke_tokens(self: any) -> None:
+        """Отзывает все выданные пользователю токены доступа."""
+        self.token_version = models.F("token_version") + 1
+        self.save(update_fields=["token_version"])
+        self.refresh_from_db(fields=["token_version"])
+
     class Meta:
         ordering = ["id"]
         verbose_name = "пользователь"
@@ -59,3 +102,27 @@ class CustomUser(AbstractUser):
     @property
     def is_moderator(self: any) -> bool:
         return self.role == UserRole.MODERATOR
+
+
+class ConfirmationCode(models.Model):
+    """Одноразовый код подтверждения для получения токена.
+
+    Хранится только хеш кода; код действует до expires_at и удаляется
+    при использовании.
+    """
+
+    user = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="confirmation_code",
+    )
+    code_hash = models.CharField("хеш кода", max_length=64)
+    expires_at = models.DateTimeField("действует до", db_index=True)
+
+    class Meta:
+        verbose_name = "код подтверждения"
+        verbose_name_plural = "коды подтверждения"
+
+    def __str__(self: any) -> str:
+        return f"{self.user_id} до {self.expires_at}"
@@ -0,0 +1,241 @@
+"""Нагрузочный тест чтения каталога через WSGI и ASGI.
+
+WSGI - обработчик Django в пуле из N потоков, как у многопоточного сервера
+WSGI. ASGI - приложение из asgi.py с N одновременными запросами в одном
+цикле событий. Серверы не запускаются: обработчики вызываются напрямую,
+поэтому замер показывает работу самого приложения. Асинхронные
+представления каталога (в том числе с чтением кеша в потоках через
+sync_to_async) оказались медленнее WSGI во всех сценариях и удалены.
+
+Сценарии:
+    cache - повторные анонимные запросы, ответы из кеша;
+    304   - условные запросы с актуальным If-None-Match;
+    db    - запросы с уникальными параметрами, каждый читает базу.
+
+Запуск из корня репозитория:
+    python benchmarks/asgi_catalog.py --requests 400 --concurrency 1 8 32
+База создаётся во временном каталоге и удаляется после замера.
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+URLS = (
+    '/api/v1/titles/',
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/1/',
+    '/api/v1/titles/1/reviews/',
+)
+
+
+def setup_database(path: Path, titles: int) -> None:
+    import django
+    from django.conf import settings
+
+    settings.DEBUG = False
+    settings.DATABASES['default']['NAME'] = path
+    settings.DATABASES['default']['OPTIONS'] = {'timeout': 30}
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    from reviews.models import Category, Genre, Review, Title
+    from users.models import CustomUser
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=2000, category=category)
+        for number in range(titles)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre_id=genre.pk)
+        for title_id in Title.objects.values_list('pk', flat=True)
+    )
+    author = CustomUser.objects.create(username='author', email='a@x.fake')
+    Review.objects.bulk_create(
+        Review(title_id=1, author=author, text=f'Отзыв {number}', score=7)
+        for number in range(1)
+    )
+
+
+def scenario_requests(scenario: str, count: int, etags: dict) -> list:
+    """Список (путь, строка запроса, заголовки) сценария."""
+    requests = []
+    for number in range(count):
+        path = URLS[number % len(URLS)]
+        query, headers = '', {}
+        if scenario == 'db':
+            query = f'nocache={number}'
+        elif scenario == '304':
+            headers = {'If-None-Match': etags[path]}
+        requests.append((path, query, headers))
+    return requests
+
+
+def wsgi_call(handler: any, path: str, query: str, headers: dict) -> int:
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        'wsgi.version': (1, 0),
+    }
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    status = []
+    response = handler(environ, lambda code, _: status.append(code))
+    b''.join(response)
+    response.close()
+    return int(status[0].split()[0])
+
+
+async def asgi_call(
+    application: any,
+    path: str,
+    query: str,
+    headers: dict,
+) -> int:
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (name.lower().encode(), value.encode())
+            for name, value in (('Host', 'localhost'), *headers.items())
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80),
+    }
+    status = []
+
+    async def receive() -> dict:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: dict) -> None:
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def run_wsgi(requests: list, concurrency: int) -> tuple:
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        statuses = list(
+            executor.map(
+                lambda request: wsgi_call(handler, *request),
+                requests,
+            ),
+        )
+        return time.perf_counter() - started, statuses
+
+
+def run_asgi(requests: list, concurrency: int) -> tuple:
+    from api_yamdb.asgi import application
+
+    async def main() -> list:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(request: tuple) -> int:
+            async with semaphore:
+                return await asgi_call(application, *request)
+
+        return await asyncio.gather(
+            *(limited(request) for request in requests),
+        )
+
+    started = time.perf_counter()
+    statuses = asyncio.run(main())
+    return time.perf_counter() - started, statuses
+
+
+def collect_etags() -> dict:
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    etags = {}
+    for path in URLS:
+        environ_headers = []
+
+        def start_response(_: str, headers: list) -> None:
+            environ_headers.extend(headers)
+
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.url_scheme': 'http',
+        }
+        handler(environ, start_response).close()
+        etags[path] = dict(environ_headers)['ETag']
+    return etags
+
+
+RUNNERS = (('WSGI', run_wsgi), ('ASGI', run_asgi))
+SCENARIOS = ('cache', '304', 'db')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--titles', type=int, default=50)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 8, 32],
+    )
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_database(Path(directory) / 'benchmark.sqlite3', options.titles)
+        etags = collect_etags()
+        print(f'{options.requests} запросов на сценарий, ответов в секунду')
+        print(f'{"сценарий":<10}{"N":>4}' + ''.join(
+            f'{name:>10}' for name, _ in RUNNERS
+        ))
+        for scenario in SCENARIOS:
+            requests = scenario_requests(scenario, options.requests, etags)
+            for concurrency in options.concurrency:
+                line = f'{scenario:<10}{concurrency:>4}'
+                for name, runner in RUNNERS:
+                    seconds, statuses = runner(requests, concurrency)
+                    assert all(status in (200, 304) for status in statuses), (
+                        f'{name}: неожиданные статусы {set(statuses)}'
+                    )
+                    line += f'{options.requests / seconds:>10.0f}'
+                print(line)
+
+
+if __name__ == '__main__':
+    main()
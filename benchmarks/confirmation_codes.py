@@ -0,0 +1,132 @@
+"""Сравнение выдачи и проверки кодов подтверждения.
+
+Сравниваются default_token_generator (HMAC по паролю и last_login, поиск
+пользователя и пересчёт хеша при проверке) и хранилище ConfirmationCode
+(одноразовый код с поиском по индексу). Каждый сценарий - параллельные
+регистрации: выдача кода и его проверка, как в Signup и Token.
+
+Запуск из корня репозитория:
+    python benchmarks/confirmation_codes.py --users 500 --threads 8
+База создаётся во временном каталоге и удаляется после замера.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+def setup_database(path: Path) -> None:
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = path
+    settings.DATABASES['default']['OPTIONS'] = {'timeout': 30}
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+
+
+def in_thread(function: any) -> any:
+    """Закрывает соединение потока после вызова, как после запроса."""
+
+    def wrapper(*args: any) -> any:
+        from django.db import connection
+
+        try:
+            return function(*args)
+        finally:
+            connection.close()
+
+    wrapper.__name__ = function.__name__
+    return wrapper
+
+
+@in_thread
+def generator_issue(username: str) -> str:
+    from django.contrib.auth.tokens import default_token_generator
+
+    from users.models import CustomUser
+
+    user = CustomUser.objects.get(username=username)
+    return default_token_generator.make_token(user)
+
+
+@in_thread
+def generator_verify(username: str, code: str) -> bool:
+    from django.contrib.auth.tokens import default_token_generator
+
+    from users.models import CustomUser
+
+    user = CustomUser.objects.get(username=username)
+    return default_token_generator.check_token(user, code)
+
+
+@in_thread
+def store_issue(username: str) -> str:
+    from users.confirmation import issue_code
+    from users.models import CustomUser
+
+    return issue_code(CustomUser.objects.get(username=username))
+
+
+@in_thread
+def store_verify(username: str, code: str) -> bool:
+    from users.confirmation import consume_code
+
+    return consume_code(username, code) is not None
+
+
+FLOWS = (
+    ('default_token_generator', generator_issue, generator_verify),
+    ('ConfirmationCode', store_issue, store_verify),
+)
+
+
+def measure(issue: any, verify: any, usernames: list, threads: int) -> tuple:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        started = time.perf_counter()
+        codes = list(executor.map(issue, usernames))
+        issued = time.perf_counter()
+        results = list(executor.map(verify, usernames, codes))
+        verified = time.perf_counter()
+    assert all(results), f'{verify.__name__}: не все коды прошли проверку'
+    return issued - started, verified - issued
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=8)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_database(Path(directory) / 'benchmark.sqlite3')
+        from users.models import CustomUser
+
+        CustomUser.objects.bulk_create(
+            CustomUser(username=f'bench{number}', email=f'b{number}@x.fake')
+            for number in range(options.users)
+        )
+        usernames = [f'bench{number}' for number in range(options.users)]
+        print(f'{options.users} регистраций в {options.threads} потоках')
+        for name, issue, verify in FLOWS:
+            issue_seconds, verify_seconds = measure(
+                issue, verify, usernames, options.threads,
+            )
+            print(
+                f'{name:<24} выдача {issue_seconds:.2f} с '
+                f'({options.users / issue_seconds:.0f}/с), '
+                f'проверка {verify_seconds:.2f} с '
+                f'({options.users / verify_seconds:.0f}/с)',
+            )
+
+
+if __name__ == '__main__':
+    main()
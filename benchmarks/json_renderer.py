@@ -0,0 +1,102 @@
+"""Рендеринг страницы из 100 произведений: JSONRenderer и FastJSONRenderer.
+
+Страница строится так же, как ответ на GET /api/v1/titles/?limit=100:
+TitleReadSerializer по произведениям с жанрами, категорией и рейтингом,
+обёрнутый в ответ пагинации. Оба рендерера кодируют одни и те же данные,
+результат сравнивается побайтно.
+
+Запуск из корня репозитория:
+    python benchmarks/json_renderer.py --titles 100 --repeat 500
+База создаётся во временном каталоге и удаляется после замера.
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import timeit
+from collections import OrderedDict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+def setup_database(path: Path) -> None:
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = path
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+
+
+def titles_page(count: int) -> OrderedDict:
+    from api.serializers import TitleReadSerializer
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Книга', slug='book')
+    genres = [
+        Genre.objects.create(name=f'Жанр «{number}»', slug=f'genre-{number}')
+        for number in range(5)
+    ]
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Произведение №{number} — «Тестовое»',
+            year=1900 + number,
+            category=category,
+            description='Описание произведения. ' * 10,
+            rating=number % 10 + 0.5,
+        )
+        title.genre.set(genres[:number % 5 + 1])
+    titles = Title.objects.select_related('category').prefetch_related(
+        'genre',
+    )
+    return OrderedDict([
+        ('count', count),
+        ('next', None),
+        ('previous', None),
+        ('results', TitleReadSerializer(titles, many=True).data),
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=500)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_database(Path(directory) / 'benchmark.sqlite3')
+        from rest_framework.parsers import JSONParser
+        from rest_framework.renderers import JSONRenderer
+
+        from api.parsers import FastJSONParser
+        from api.renderers import FastJSONRenderer, orjson
+
+        data = titles_page(options.titles)
+        content = JSONRenderer().render(data)
+        assert FastJSONRenderer().render(data) == content, (
+            'FastJSONRenderer выводит не те же байты, что JSONRenderer'
+        )
+        print(
+            f'{options.titles} произведений, {len(content)} байт, '
+            f'orjson {"установлен" if orjson else "не установлен"}',
+        )
+        for name, call in (
+            ('JSONRenderer', lambda: JSONRenderer().render(data)),
+            ('FastJSONRenderer', lambda: FastJSONRenderer().render(data)),
+            ('JSONParser', lambda: JSONParser().parse(io.BytesIO(content))),
+            (
+                'FastJSONParser',
+                lambda: FastJSONParser().parse(io.BytesIO(content)),
+            ),
+        ):
+            seconds = min(timeit.repeat(call, number=options.repeat, repeat=3))
+            print(f'{name:<18} {seconds / options.repeat * 1e6:8.1f} мкс')
+
+
+if __name__ == '__main__':
+    main()
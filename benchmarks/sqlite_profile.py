@@ -0,0 +1,142 @@
+"""Читатели и писатели SQLite: настройки по умолчанию и профиль production.
+
+Потоки-читатели выбирают страницу отзывов с авторами, потоки-писатели
+добавляют комментарии. Каждая операция выполняется как отдельный запрос
+к серверу: соединения закрываются или переиспользуются по CONN_MAX_AGE.
+Для каждого профиля создаётся своя база во временном каталоге.
+
+Запуск из корня репозитория:
+    python benchmarks/sqlite_profile.py --readers 4 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+def profiles() -> dict:
+    from django.conf import settings
+
+    return {
+        'default': {},
+        'production': {
+            'PRAGMAS': settings.SQLITE_PRODUCTION_PRAGMAS,
+            'CONN_MAX_AGE': 600,
+        },
+    }
+
+
+def use_database(path: Path, profile: dict) -> None:
+    """Переключает базу default на новый файл с настройками профиля."""
+    from django.core.management import call_command
+    from django.db import connections
+
+    connections['default'].close()
+    database = connections.settings['default']
+    database.pop('PRAGMAS', None)
+    database.update({'NAME': str(path), 'CONN_MAX_AGE': 0, **profile})
+    call_command('migrate', verbosity=0)
+
+    from reviews.models import Review, Title
+    from users.models import CustomUser
+
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench{number}', email=f'b{number}@x.fake')
+        for number in range(50)
+    )
+    title = Title.objects.create(name='Произведение', year=2000)
+    Review.objects.bulk_create(
+        Review(title=title, author=user, text='Отзыв ' * 20, score=7)
+        for user in CustomUser.objects.all()
+    )
+    connections['default'].close()
+
+
+def read_reviews(number: int) -> None:
+    from reviews.models import Review
+
+    list(Review.objects.select_related('author')[:20])
+
+
+def write_comment(number: int) -> None:
+    from reviews.models import Comment, Review
+
+    review = Review.objects.order_by('pk')[number % 50]
+    Comment.objects.create(review=review, author=review.author, text='Да')
+
+
+def worker(operation: any, deadline: float, counts: dict, key: str) -> None:
+    from django.db import OperationalError, close_old_connections, connection
+
+    done = errors = 0
+    while time.monotonic() < deadline:
+        close_old_connections()
+        try:
+            operation(done + errors)
+            done += 1
+        except OperationalError:
+            errors += 1
+        finally:
+            close_old_connections()
+    connection.close()
+    with counts['lock']:
+        counts[key] += done
+        counts['errors'] += errors
+
+
+def measure(readers: int, writers: int, seconds: float) -> dict:
+    counts = {'reads': 0, 'writes': 0, 'errors': 0, 'lock': threading.Lock()}
+    deadline = time.monotonic() + seconds
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(read_reviews, deadline, counts, 'reads'),
+        )
+        for _ in range(readers)
+    ] + [
+        threading.Thread(
+            target=worker,
+            args=(write_comment, deadline, counts, 'writes'),
+        )
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    options = parser.parse_args()
+
+    import django
+
+    django.setup()
+    print(
+        f'{options.readers} читателей, {options.writers} писателей, '
+        f'{options.seconds:g} с на профиль',
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for name, profile in profiles().items():
+            use_database(Path(directory) / f'{name}.sqlite3', profile)
+            counts = measure(options.readers, options.writers, options.seconds)
+            print(
+                f'{name:<12} чтений {counts["reads"] / options.seconds:7.0f}/с'
+                f'  записей {counts["writes"] / options.seconds:6.0f}/с'
+                f'  ошибок блокировки {counts["errors"]}',
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import pytest
+
+from tests.utils import create_categories, create_genre
+
+TITLES_COUNT = 12
+
+
+@pytest.fixture
+def many_titles(admin_client):
+    genres = create_genre(admin_client)
+    categories = create_categories(admin_client)
+    titles = []
+    for number in range(TITLES_COUNT):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': f'Произведение {number:02}',
+            'year': 2000 + number,
+            'genre': [genre['slug'] for genre in genres[:number % 3 + 1]],
+            'category': categories[number % 2]['slug'],
+        })
+        titles.append(response.json())
+    return titles
+
+
+@pytest.fixture
+def search_titles():
+    from reviews.models import Title
+
+    return [
+        Title.objects.create(name=name, year=2000, description=description)
+        for name, description in (
+            ('Сказка о рыбаке и рыбке', 'Сказка в стихах'),
+            ('Капитанская дочка', 'Роман о пугачёвском бунте'),
+            ('Евгений Онегин', 'Роман в стихах о капитане'),
+            ('Пиковая дама', ''),
+        )
+    ]
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.fixture
+def count_queries():
+    """Выполняет запрос клиентом и считает запросы к базе при его обработке.
+
+    Кеш версий токенов в памяти процесса очищается, чтобы проверка токена
+    всегда стоила одинаковое число запросов.
+    """
+    from api.authentication import token_versions
+    from core.queries import collect_queries
+
+    def count(client, method, url, **kwargs):
+        with token_versions.lock:
+            token_versions.versions.clear()
+        with collect_queries() as stats:
+            response = getattr(client, method)(url, **kwargs)
+        return response, stats.count
+
+    return count
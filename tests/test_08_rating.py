@@ -0,0 +1,116 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.utils import create_single_review, create_titles
+
+
+def get_rating(client, title_id):
+    return client.get(f'/api/v1/titles/{title_id}/').json().get('rating')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        review = create_single_review(user_client, title_id, 'Так себе', 4)
+        assert get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        user_client.patch(
+            f'{url}{review.json()["id"]}/', data={'score': 2}
+        )
+        assert get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        moderator_client.delete(f'{url}{review.json()["id"]}/')
+        assert get_rating(admin_client, title_id) == 10, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        from reviews.models import Review
+        Review.objects.all().delete()
+        assert get_rating(admin_client, title_id) is None, (
+            'Проверьте, что у произведения без отзывов рейтинг равен `None`.'
+        )
+
+    def test_02_recount_ratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отлично', 9)
+        call_command('recount_ratings', '--check')
+
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=0, rating_count=0, rating=None
+        )
+        with pytest.raises(CommandError):
+            call_command('recount_ratings', '--check')
+
+        call_command('recount_ratings')
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            9, 1, 9.0
+        ), 'Команда `recount_ratings` должна восстанавливать рейтинг.'
+
+    def test_03_title_update_keeps_rating(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        # Произведение прочитано до отзыва, как в форме админки или в
+        # PATCH, пересекающемся с созданием отзыва.
+        stale = Title.objects.get(pk=title_id)
+        create_single_review(user_client, title_id, 'Отлично', 8)
+        stale.name = 'Новое название'
+        stale.save()
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data={'description': 'Описание'}
+        )
+        assert response.status_code == 200
+        title = Title.objects.get(pk=title_id)
+        assert (title.name, title.description) == (
+            'Новое название', 'Описание'
+        )
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            8, 1, 8.0
+        ), (
+            'Проверьте, что сохранение произведения не перезаписывает '
+            'рейтинг, изменённый отзывом после чтения произведения.'
+        )
+
+    def test_04_deferred_title_save(self, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.only('name').get(pk=titles[0]['id'])
+        title.name = 'Отложенные поля'
+        with CaptureQueriesContext(connection) as context:
+            title.save()
+        update = context.captured_queries[0]['sql']
+        assert update.startswith('UPDATE') and '"year"' not in update, (
+            'Проверьте, что сохранение произведения, загруженного с only(), '
+            'обновляет только загруженные поля без чтения отложенных.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.name, title.year) == (
+            'Отложенные поля', titles[0]['year']
+        ), (
+            'Проверьте, что сохранение произведения с отложенными полями '
+            'не читает их из базы и не меняет.'
+        )
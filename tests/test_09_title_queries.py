@@ -0,0 +1,34 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('query', [
+        '',
+        '?limit=20',
+        '?genre=horror',
+        '?category=films&genre=comedy',
+    ])
+    def test_01_title_list_query_budget(self, client, many_titles,
+                                        django_assert_num_queries, query):
+        url = f'/api/v1/titles/{query}'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.json()['results'], (
+            f'Проверьте, что GET-запрос к `{url}` возвращает произведения.'
+        )
+
+    def test_02_title_detail_query_budget(self, client, many_titles,
+                                          django_assert_num_queries):
+        title = many_titles[-1]
+        url = f'/api/v1/titles/{title["id"]}/'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        data = response.json()
+        assert {genre['slug'] for genre in data['genre']} == set(
+            title['genre']
+        ), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит все '
+            'жанры произведения.'
+        )
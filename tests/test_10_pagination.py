@@ -0,0 +1,160 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review
+
+
+def collect_pages(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` в keyset-режиме '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в keyset-режиме пагинации не считается `count`.'
+        )
+        pages.append(data)
+        url = data['next']
+    return pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    def test_01_titles_cursor_pages(self, client, many_titles):
+        url = '/api/v1/titles/?pagination=cursor&limit=5'
+        pages = collect_pages(client, url)
+        names = [title['name'] for page in pages for title in page['results']]
+        assert names == sorted(title['name'] for title in many_titles), (
+            'Проверьте, что в keyset-режиме `/api/v1/titles/` произведения '
+            'выдаются по одному разу, упорядоченными по имени.'
+        )
+        assert [len(page['results']) for page in pages] == [5, 5, 2]
+        assert pages[0]['previous'] is None
+
+        response = client.get(pages[-1]['previous'])
+        data = response.json()
+        assert data['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` в keyset-режиме ведёт на '
+            'предыдущую страницу.'
+        )
+        assert client.get(data['previous']).json()['previous'] is None
+
+    def test_02_titles_cursor_with_filter(self, client, many_titles):
+        pages = collect_pages(
+            client, '/api/v1/titles/?pagination=cursor&limit=2&genre=comedy'
+        )
+        ids = {title['id'] for page in pages for title in page['results']}
+        expected = {
+            title['id'] for title in many_titles if 'comedy' in title['genre']
+        }
+        assert ids == expected
+
+    def test_03_reviews_cursor_pages(self, admin_client, many_titles,
+                                     django_user_model):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        title_id = many_titles[0]['id']
+        for number in range(7):
+            author = django_user_model.objects.create_user(
+                username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+            )
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}'
+            )
+            create_single_review(client, title_id, f'Отзыв {number}', 5)
+
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        expected = [
+            review['id'] for review in admin_client.get(url).json()['results']
+        ]
+        pages = collect_pages(admin_client, f'{url}?pagination=cursor&limit=3')
+        ids = [review['id'] for page in pages for review in page['results']]
+        assert ids == expected, (
+            'Проверьте, что в keyset-режиме отзывы выдаются в том же порядке, '
+            'что и при пагинации limit/offset.'
+        )
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('url,position', [
+        ('/api/v1/titles/', ['x', 'abc']),
+        ('/api/v1/titles/', ['a', {'z': 1}]),
+        ('/api/v1/titles/', ['a', None]),
+        ('/api/v1/titles/{title_id}/reviews/', ['garbage', 1]),
+    ])
+    def test_05_tampered_cursor(self, client, many_titles, url, position):
+        cursor = base64.urlsafe_b64encode(
+            json.dumps({'p': position}).encode()
+        ).decode()
+        url = url.format(title_id=many_titles[0]['id'])
+        response = client.get(f'{url}?cursor={cursor}')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что курсор с неверными значениями {position} '
+            f'в запросе к `{url}` даёт ответ со статусом 404.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10PaginationCount:
+
+    def test_01_count_can_be_skipped(self, client, many_titles,
+                                     django_assert_num_queries):
+        url = '/api/v1/titles/?limit=5&offset=5&count=false'
+        with django_assert_num_queries(2):
+            data = client.get(url).json()
+        assert 'count' not in data, (
+            f'Проверьте, что GET-запрос к `{url}` не возвращает `count`.'
+        )
+        assert len(data['results']) == 5
+        assert data['next'] and data['previous']
+
+        data = client.get('/api/v1/titles/?limit=5&offset=10&count=0').json()
+        assert len(data['results']) == 2 and data['next'] is None
+
+    def test_02_cached_count(self, admin_client, many_titles, user_client,
+                             user, moderator):
+        from reviews.models import Review
+
+        title_id = many_titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/?limit=1'
+        create_single_review(admin_client, title_id, 'Первый', 5)
+        create_single_review(user_client, title_id, 'Второй', 6)
+        assert admin_client.get(url).json()['count'] == 2
+
+        Review.objects.bulk_create(
+            [Review(title_id=title_id, author=moderator, text='Без сигналов')]
+        )
+        assert admin_client.get(url).json()['count'] == 2
+
+        Review.objects.filter(author=user).delete()
+        assert admin_client.get(url).json()['count'] == 2, (
+            'Проверьте, что закешированный `count` сбрасывается при '
+            'изменении отзывов.'
+        )
+
+    def test_03_estimated_count(self, client, many_titles, monkeypatch):
+        from api.views import TitleViewSet
+
+        monkeypatch.setattr(TitleViewSet, 'pagination_count', 'estimate',
+                            raising=False)
+        monkeypatch.setattr(TitleViewSet, 'estimate_count',
+                            lambda self, queryset: 1000, raising=False)
+        data = client.get('/api/v1/titles/?limit=5').json()
+        assert data['count'] == 1000
+        assert len(data['results']) == 5
+
+        data = client.get('/api/v1/titles/?limit=5&offset=10').json()
+        assert data['count'] == len(many_titles), (
+            'На последней странице число записей известно точно.'
+        )
@@ -0,0 +1,306 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+# Импорт в несколько процессов: процессы пула открывают файл базы заново,
+# поэтому тестовая база в памяти не подходит - импорт идёт в отдельном
+# процессе с базой во временном файле.
+PARALLEL_IMPORT = '''
+import json
+import sys
+from io import StringIO
+
+import django
+from django.conf import settings
+
+settings.DATABASES['default']['NAME'] = sys.argv[1]
+django.setup()
+
+from django.core.management import call_command
+from reviews.models import Category, Comment, CustomUser, Genre, Review, Title
+from reviews.ratings import find_rating_mismatches
+from reviews.search import get_search_backend
+
+call_command('migrate', verbosity=0)
+call_command(
+    'import_csv', '--workers', '2', '--batch-size', '10', stdout=StringIO()
+)
+found = get_search_backend().search(Title.objects.all(), sys.argv[2])
+print(json.dumps({
+    'counts': {
+        model.__name__: model.objects.count()
+        for model in (Category, Genre, Title, CustomUser, Review, Comment)
+    },
+    'links': Title.genre.through.objects.count(),
+    'rated': Title.objects.filter(rating__isnull=False).count(),
+    'mismatches': len(find_rating_mismatches()),
+    'found': list(found.values_list('id', flat=True)),
+}))
+'''
+
+
+def read_rows(filename):
+    with open(os.path.join(DATA_PATH, filename), encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ImportCsv:
+
+    def check_imported(self):
+        from reviews.models import (Category, Comment, CustomUser, Genre,
+                                    Review, Title)
+
+        expected = (
+            (Category, 'category.csv'),
+            (Genre, 'genre.csv'),
+            (Title, 'titles.csv'),
+            (CustomUser, 'users.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        )
+        for model, filename in expected:
+            ids = {int(row['id']) for row in read_rows(filename)}
+            assert set(model.objects.values_list('id', flat=True)) == ids, (
+                f'Проверьте, что команда `import_csv` загружает все записи '
+                f'из файла `{filename}`.'
+            )
+        for row in read_rows('review.csv'):
+            review = Review.objects.get(pk=row['id'])
+            assert (review.title_id, review.author_id) == (
+                int(row['title_id']), int(row['author'])
+            )
+        links = {
+            (int(row['title_id']), int(row['genre_id']))
+            for row in read_rows('genre_title.csv')
+        }
+        assert set(
+            Title.genre.through.objects.values_list('title_id', 'genre_id')
+        ) == links, (
+            'Проверьте, что команда `import_csv` сохраняет все жанры '
+            'произведений из файла `genre_title.csv`.'
+        )
+
+    def test_01_import_csv(self):
+        out = StringIO()
+        call_command('import_csv', '--batch-size', '10', stdout=out)
+        self.check_imported()
+        assert 'строк/с' in out.getvalue(), (
+            'Проверьте, что команда `import_csv` сообщает скорость импорта.'
+        )
+
+    def test_02_import_csv_twice(self):
+        from pathlib import Path
+
+        from core.csv_import import run_import
+
+        call_command('import_csv', stdout=StringIO())
+        stats = run_import(Path(DATA_PATH), 1000, lambda *args: None)
+        self.check_imported()
+        for filename, rows, skipped, _ in stats:
+            assert (rows, skipped) == (0, len(read_rows(filename))), (
+                'Проверьте, что повторный импорт не считает загруженными '
+                'строки, которые уже есть в базе, и сообщает о пропущенных.'
+            )
+
+    def test_03_conflicting_rows_skipped(self, tmp_path):
+        import shutil
+
+        from reviews.models import CustomUser
+
+        shutil.copytree(DATA_PATH, tmp_path, dirs_exist_ok=True)
+        users = read_rows('users.csv')
+        users.append({**users[0], 'id': 999, 'email': 'other@yamdb.fake'})
+        with open(tmp_path / 'users.csv', 'w', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=users[0])
+            writer.writeheader()
+            writer.writerows(users)
+        out = StringIO()
+        call_command('import_csv', '--path', str(tmp_path), stdout=out)
+        assert not CustomUser.objects.filter(pk=999).exists()
+        assert 'пропущено 1 строк' in out.getvalue(), (
+            'Проверьте, что команда `import_csv` сообщает о строках, '
+            'пропущенных из-за нарушения уникальности.'
+        )
+
+    def test_04_import_order_follows_dependencies(self):
+        from core.csv_import import SOURCES, dependencies
+
+        graph = dependencies(SOURCES)
+        assert graph['category.csv'] == graph['users.csv'] == set()
+        assert graph['review.csv'] == {'titles.csv', 'users.csv'}
+        assert graph['genre_title.csv'] == {'titles.csv', 'genre.csv'}
+
+        out = StringIO()
+        call_command('import_csv', '--workers', '1', stdout=out)
+        self.check_imported()
+        for source in SOURCES:
+            assert source.filename in out.getvalue(), (
+                'Проверьте, что команда `import_csv` выводит время загрузки '
+                'каждого файла.'
+            )
+
+    def test_05_resume_from_checkpoints(self):
+        from pathlib import Path
+
+        from core.csv_import import read_chunks
+        from core.models import ImportCheckpoint
+        from reviews.models import Title
+
+        call_command('import_csv', '--batch-size', '7', stdout=StringIO())
+        assert all(
+            checkpoint.completed
+            for checkpoint in ImportCheckpoint.objects.all()
+        ), 'Проверьте, что после импорта файлы отмечены загруженными.'
+        links = ImportCheckpoint.objects.get(filename='genre_title.csv')
+        assert links.rows == len(read_rows('genre_title.csv'))
+
+        # Имитируем падение посреди genre_title.csv: после первой пачки
+        # связи из файла в базу не попали.
+        chunk, offset = next(
+            read_chunks(Path(DATA_PATH) / 'genre_title.csv', 7)
+        )
+        kept = {(int(row['title_id']), int(row['genre_id'])) for row in chunk}
+        for link in Title.genre.through.objects.all():
+            if (link.title_id, link.genre_id) not in kept:
+                link.delete()
+        ImportCheckpoint.objects.filter(filename='genre_title.csv').update(
+            rows=7, offset=offset, completed=False
+        )
+
+        call_command(
+            'import_csv', '--resume', '--batch-size', '7', stdout=StringIO()
+        )
+        self.check_imported()
+        links.refresh_from_db()
+        assert links.completed and links.rows == len(
+            read_rows('genre_title.csv')
+        ), (
+            'Проверьте, что `import_csv --resume` продолжает загрузку файла '
+            'с контрольной точки.'
+        )
+
+    @pytest.mark.parametrize('options', [
+        [],
+        ['--gzip', '--workers', '2'],
+        ['--format', 'jsonl', '--gzip'],
+    ])
+    def test_06_export_and_reimport(self, tmp_path, options):
+        from reviews.models import Category, CustomUser, Genre, Title
+
+        call_command('import_csv', stdout=StringIO())
+        out = StringIO()
+        call_command(
+            'export_csv', '--path', str(tmp_path), *options, stdout=out
+        )
+        assert 'строк/с' in out.getvalue()
+        assert len(list(tmp_path.iterdir())) == 7, (
+            'Проверьте, что команда `export_csv` выгружает каждую модель в '
+            'отдельный файл.'
+        )
+
+        Title.objects.all().delete()
+        for model in (Category, Genre, CustomUser):
+            model.objects.all().delete()
+        call_command('import_csv', '--path', str(tmp_path), stdout=StringIO())
+        self.check_imported()
+
+    @pytest.mark.parametrize('file_format', ['csv', 'jsonl'])
+    def test_07_export_round_trip(self, tmp_path, file_format):
+        from reviews.models import (Category, Comment, CustomUser, Genre,
+                                    Review, Title)
+
+        call_command('import_csv', stdout=StringIO())
+        Title.objects.filter(pk=1).update(
+            category=None, description='Описание'
+        )
+        CustomUser.objects.filter(pk=100).update(bio='Биография')
+        fields = {
+            Title: ('name', 'year', 'category_id', 'description', 'rating'),
+            CustomUser: ('username', 'email', 'role', 'bio'),
+            Review: ('title_id', 'author_id', 'text', 'score', 'pub_date'),
+            Comment: ('review_id', 'author_id', 'text', 'pub_date'),
+        }
+        expected = {
+            model: list(model.objects.order_by('pk').values_list(*names))
+            for model, names in fields.items()
+        }
+        assert expected[Title][0][2] is None
+
+        call_command(
+            'export_csv', '--path', str(tmp_path), '--format', file_format,
+            stdout=StringIO(),
+        )
+        Title.objects.all().delete()
+        for model in (Category, Genre, CustomUser):
+            model.objects.all().delete()
+        call_command('import_csv', '--path', str(tmp_path), stdout=StringIO())
+        for model, names in fields.items():
+            assert list(
+                model.objects.order_by('pk').values_list(*names)
+            ) == expected[model], (
+                f'Проверьте, что выгрузка и повторный импорт сохраняют поля '
+                f'{", ".join(names)} модели `{model.__name__}`, в том числе '
+                f'пустые внешние ключи.'
+            )
+
+    def test_08_parallel_import(self, tmp_path):
+        result = subprocess.run(
+            [
+                sys.executable, '-c', PARALLEL_IMPORT,
+                str(tmp_path / 'db.sqlite3'), 'шоушенк',
+            ],
+            cwd=MANAGE_PATH,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings'},
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+        assert result.returncode == 0, result.stderr
+        stats = json.loads(result.stdout.splitlines()[-1])
+        expected = {
+            'Category': 'category.csv',
+            'Genre': 'genre.csv',
+            'Title': 'titles.csv',
+            'CustomUser': 'users.csv',
+            'Review': 'review.csv',
+            'Comment': 'comments.csv',
+        }
+        for model, filename in expected.items():
+            assert stats['counts'][model] == len(read_rows(filename)), (
+                f'Проверьте, что `import_csv --workers 2` загружает все '
+                f'записи из файла `{filename}`.'
+            )
+        assert stats['links'] == len(read_rows('genre_title.csv'))
+        rated = {row['title_id'] for row in read_rows('review.csv')}
+        assert (stats['rated'], stats['mismatches']) == (len(rated), 0), (
+            'Проверьте, что после импорта в несколько процессов рейтинги '
+            'произведений пересчитаны.'
+        )
+        assert stats['found'] == [1], (
+            'Проверьте, что после импорта в несколько процессов поисковый '
+            'индекс перестроен.'
+        )
+
+    def test_09_no_fork_falls_back(self, monkeypatch, caplog):
+        import multiprocessing
+
+        monkeypatch.setattr(
+            multiprocessing, 'get_all_start_methods', lambda: ['spawn']
+        )
+        call_command('import_csv', '--workers', '2', stdout=StringIO())
+        self.check_imported()
+        assert 'fork недоступен' in caplog.text, (
+            'Проверьте, что без fork импорт выполняется в одном процессе '
+            'и сообщает об этом.'
+        )
@@ -0,0 +1,67 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+def search(client, query):
+    response = client.get('/api/v1/titles/', {'search': query})
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    def test_01_search_by_words(self, client, search_titles):
+        assert search(client, 'сказка') == ['Сказка о рыбаке и рыбке'], (
+            'Проверьте, что параметр `search` находит произведения по слову '
+            'из названия.'
+        )
+        assert search(client, 'рыб СКАЗ') == ['Сказка о рыбаке и рыбке'], (
+            'Проверьте, что параметр `search` ищет слова по началу и без '
+            'учёта регистра.'
+        )
+        assert search(client, 'сказка дама') == []
+        assert search(client, '!!!') == []
+
+    def test_02_relevance_ordering(self, client, search_titles):
+        assert search(client, 'капитан') == [
+            'Капитанская дочка', 'Евгений Онегин'
+        ], (
+            'Проверьте, что совпадение в названии ставит произведение выше '
+            'совпадения в описании.'
+        )
+
+    def test_03_index_follows_titles(self, client, search_titles):
+        title = search_titles[-1]
+        title.name = 'Барышня-крестьянка'
+        title.save()
+        assert search(client, 'дама') == []
+        assert search(client, 'барышня') == ['Барышня-крестьянка'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        title.delete()
+        assert search(client, 'барышня') == []
+
+    def test_04_rebuild_command(self, client, search_titles):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_title_fts')
+        assert search(client, 'роман') == []
+        call_command('rebuild_search_index', stdout=StringIO())
+        assert set(search(client, 'роман')) == {
+            'Евгений Онегин', 'Капитанская дочка'
+        }, (
+            'Проверьте, что команда `rebuild_search_index` перестраивает '
+            'поисковый индекс.'
+        )
+
+    def test_05_backend_must_search(self):
+        from reviews.search import TitleSearchBackend
+
+        class NoSearch(TitleSearchBackend):
+            pass
+
+        with pytest.raises(TypeError):
+            NoSearch()
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ResponseCache:
+
+    def test_01_cache_hit(self, client, many_titles,
+                          django_assert_num_queries):
+        url = '/api/v1/titles/?genre=comedy'
+        first = client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный GET-запрос к `/api/v1/titles/` '
+            'отдаётся из кеша без запросов к базе.'
+        )
+        assert second.json() == first.json()
+        assert client.get(f'{url}&limit=1')['X-Cache'] == 'MISS', (
+            'Проверьте, что параметры запроса входят в ключ кеша.'
+        )
+
+    def test_02_invalidation(self, admin_client, user_client, many_titles):
+        title_id = many_titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/'
+        category = many_titles[0]['category']
+        assert admin_client.get(url).json()['rating'] is None
+        assert admin_client.get(url)['X-Cache'] == 'HIT'
+
+        create_single_review(user_client, title_id, 'Отлично', 8)
+        response = admin_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что закешированное произведение обновляется при '
+            'изменении его отзывов.'
+        )
+
+        admin_client.get('/api/v1/categories/')
+        admin_client.delete(f'/api/v1/categories/{category}/')
+        assert admin_client.get(url).json()['category'] is None, (
+            'Проверьте, что закешированное произведение обновляется при '
+            'удалении его категории.'
+        )
+        categories = admin_client.get('/api/v1/categories/').json()
+        assert category not in [row['slug'] for row in categories['results']]
+
+    def test_03_cache_per_role(self, client, admin_client, many_titles):
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        assert admin_client.get('/api/v1/genres/')['X-Cache'] == 'MISS', (
+            'Проверьте, что роль пользователя входит в ключ кеша.'
+        )
+
+    def test_04_stats(self, client, admin_client, user_client):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        url = '/api/v1/cache/stats/'
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+        stats = admin_client.get(url).json()
+        assert stats['GenreViewSet'] == {'hit': 1, 'miss': 1}, (
+            'Проверьте, что `/api/v1/cache/stats/` возвращает счётчики '
+            'попаданий и промахов кеша.'
+        )
+
+    def test_05_local_cache_needs_single_process(self, settings, tmp_path):
+        from django.apps import apps
+        from django.core.cache.backends.filebased import FileBasedCache
+        from django.core.exceptions import ImproperlyConfigured
+
+        from api.cache import cache_is_shared
+
+        assert cache_is_shared()
+        settings.SERVER_PROCESSES = 2
+        assert not cache_is_shared(), (
+            'Проверьте, что кеш в памяти процесса не считается общим для '
+            'нескольких процессов сервера.'
+        )
+        assert cache_is_shared(FileBasedCache(str(tmp_path), {}))
+        with pytest.raises(ImproperlyConfigured):
+            apps.get_app_config('core').ready()
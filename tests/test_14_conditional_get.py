@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    """Переключает кеш версий и ответов, имитируя процессы сервера."""
+    from api import cache as api_cache
+
+    @contextmanager
+    def process(backend):
+        saved = api_cache.cache
+        monkeypatch.setattr(api_cache, 'cache', backend)
+        try:
+            yield
+        finally:
+            monkeypatch.setattr(api_cache, 'cache', saved)
+
+    return process
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    def test_01_reviews_not_modified(self, admin_client, user_client,
+                                     many_titles, django_assert_num_queries):
+        title_id = many_titles[0]['id']
+        other_id = many_titles[1]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        create_single_review(admin_client, title_id, 'Отлично', 9)
+
+        response = user_client.get(url)
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        with django_assert_num_queries(1):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что на GET-запрос с совпадающим `If-None-Match` '
+            'возвращается ответ со статусом 304 без выборки отзывов.'
+        )
+
+        create_single_review(admin_client, other_id, 'Другое', 5)
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзывы другого произведения не меняют `ETag`.'
+        )
+
+        create_single_review(user_client, title_id, 'Так себе', 4)
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет `ETag` списка отзывов.'
+        )
+        assert len(response.json()['results']) == 2
+
+    def test_02_comments_follow_review_delete(self, admin_client,
+                                              user_client, many_titles):
+        title_id = many_titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'Отлично', 9
+        ).json()
+        url = f'/api/v1/titles/{title_id}/reviews/{review["id"]}/comments/'
+        admin_client.post(url, data={'text': 'Согласен'})
+        etag = user_client.get(url)['ETag']
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.NOT_MODIFIED
+
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        )
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что удаление отзыва меняет `ETag` его комментариев.'
+        )
+
+    def test_03_catalog_if_modified_since(self, client, admin_client,
+                                          many_titles):
+        url = '/api/v1/genres/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что на GET-запрос с `If-Modified-Since` не раньше '
+            '`Last-Modified` возвращается ответ со статусом 304.'
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT'
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        url = '/api/v1/categories/'
+        last_modified = client.get(url)['Last-Modified']
+        admin_client.post(url, data={'name': 'Новая', 'slug': 'new'})
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение в ту же секунду, что и предыдущий '
+            'ответ, меняет `Last-Modified`.'
+        )
+
+    @pytest.mark.parametrize('shared', [True, False])
+    def test_04_two_processes(self, settings, tmp_path, processes, shared,
+                              admin_client, user_client, many_titles):
+        from django.core.cache.backends.filebased import FileBasedCache
+        from django.core.cache.backends.locmem import LocMemCache
+
+        if shared:
+            first, second = (
+                FileBasedCache(str(tmp_path), {}) for _ in range(2)
+            )
+        else:
+            settings.SERVER_PROCESSES = 2
+            first, second = (
+                LocMemCache(f'process-{number}', {}) for number in range(2)
+            )
+        title_id = many_titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        with processes(first):
+            response = user_client.get(url)
+        assert bool(response.get('ETag')) == shared, (
+            'Проверьте, что валидаторы выдаются, только если кеш общий для '
+            'процессов сервера.'
+        )
+        with processes(second):
+            create_single_review(admin_client, title_id, 'Отлично', 9)
+        with processes(first):
+            response = user_client.get(
+                url, HTTP_IF_NONE_MATCH=response.get('ETag', '*')
+            )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что процесс не отвечает 304 на данные, изменённые '
+            'в другом процессе.'
+        )
+        assert len(response.json()['results']) == 1
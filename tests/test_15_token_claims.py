@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+
+def claims_client(user):
+    from api.authentication import ClaimsAccessToken
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TokenClaims:
+
+    def test_01_token_view_issues_claims(self, client, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from users.confirmation import issue_code
+
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': issue_code(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json().split()[-1])
+        assert (token['username'], token['role'], token['ver']) == (
+            user.username, user.role, 0
+        ), 'Проверьте, что токен содержит имя, роль и версию токенов.'
+
+    def test_02_no_auth_queries(self, admin, django_assert_num_queries):
+        client = claims_client(admin)
+        url = '/api/v1/cache/stats/'
+        assert client.get(url).status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запрос с токеном, содержащим роль, не читает '
+            'пользователя из базы.'
+        )
+
+    def test_03_role_change_revokes_tokens(self, admin_client, moderator):
+        client = claims_client(moderator)
+        url = '/api/v1/titles/1/reviews/'
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+        admin_client.patch(
+            f'/api/v1/users/{moderator.username}/', data={'role': 'user'}
+        )
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что изменение роли пользователя отзывает выданные '
+            'ему токены.'
+        )
+        moderator.refresh_from_db()
+        assert claims_client(moderator).get(url).status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+
+        moderator.revoke_tokens()
+        assert claims_client(moderator).get(url).status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_04_me_loads_profile(self, user):
+        client = claims_client(user)
+        data = client.get('/api/v1/users/me/').json()
+        assert (data['email'], data['bio']) == (user.email, user.bio)
+        response = client.patch('/api/v1/users/me/', data={'bio': 'Новое'})
+        assert response.json()['bio'] == 'Новое'
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение профиля без смены роли и имени не '
+            'отзывает токены.'
+        )
+
+    @pytest.mark.parametrize('shared', [True, False])
+    def test_05_revocation_across_processes(self, settings, tmp_path,
+                                            shared, user):
+        from django.core.cache.backends.filebased import FileBasedCache
+        from django.core.cache.backends.locmem import LocMemCache
+
+        from api.authentication import TokenVersions
+
+        if shared:
+            backends = [FileBasedCache(str(tmp_path), {}) for _ in range(2)]
+        else:
+            settings.SERVER_PROCESSES = 2
+            backends = [
+                LocMemCache(f'process-{number}', {}) for number in range(2)
+            ]
+        first, second = (
+            TokenVersions(ttl=0, backend=backend) for backend in backends
+        )
+        version = user.token_version
+        assert first.get(user.pk) == second.get(user.pk) == version
+
+        user.revoke_tokens()
+        second.forget(user.pk)
+        assert first.get(user.pk) == version + 1, (
+            'Проверьте, что отзыв токенов в одном процессе виден другим '
+            'процессам, как только истекает срок версии в памяти процесса.'
+        )
@@ -0,0 +1,86 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+    failures = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if CountingBackend.failures:
+            CountingBackend.failures -= 1
+            raise ConnectionError('Почтовый сервер недоступен')
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def counting_backend(settings):
+    settings.EMAIL_BACKEND = 'tests.test_16_mail_outbox.CountingBackend'
+    CountingBackend.opened = 0
+    CountingBackend.failures = 0
+    return CountingBackend
+
+
+def signup(client, number):
+    return client.post('/api/v1/auth/signup/', data={
+        'email': f'outbox{number}@yamdb.fake',
+        'username': f'outbox{number}',
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16MailOutbox:
+
+    def test_01_signup_only_enqueues(self, client, counting_backend):
+        from core.models import OutgoingEmail
+
+        for number in range(5):
+            assert signup(client, number).status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация ставит письмо в очередь, а не '
+            'отправляет его во время запроса.'
+        )
+        assert OutgoingEmail.objects.filter(sent_at__isnull=True).count() == 5
+
+        out = StringIO()
+        call_command('send_outbox', '--batch-size', '2', stdout=out)
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'outbox{number}@yamdb.fake' for number in range(5)
+        ]
+        assert counting_backend.opened == 1, (
+            'Проверьте, что команда `send_outbox` отправляет все пачки '
+            'через одно соединение.'
+        )
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+        assert 'Отправлено писем: 5' in out.getvalue()
+
+    def test_02_retry_with_backoff(self, client, counting_backend):
+        from django.utils import timezone
+
+        from core.models import OutgoingEmail
+
+        signup(client, 1)
+        counting_backend.failures = 1
+        call_command('send_outbox', stdout=StringIO())
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None and email.attempts == 1
+        assert 'ConnectionError' in email.last_error
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что письмо с ошибкой отправки повторяется не сразу.'
+        )
+
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == 0
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_outbox', stdout=StringIO())
+        email.refresh_from_db()
+        assert email.sent_at is not None and len(mail.outbox) == 1
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+SIGNUP_DATA = {'email': 'code@yamdb.fake', 'username': 'code_user'}
+
+
+def signup_code(client):
+    client.post(URL_SIGNUP, data=SIGNUP_DATA)
+    call_command('send_outbox', stdout=StringIO())
+    return mail.outbox[-1].body
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ConfirmationCodes:
+
+    def test_01_code_is_one_time(self, client, django_assert_max_num_queries):
+        code = signup_code(client)
+        data = {'username': SIGNUP_DATA['username'], 'confirmation_code': code}
+        # Поиск кода, BEGIN и DELETE использованного кода.
+        with django_assert_max_num_queries(3):
+            response = client.post(URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что код из письма позволяет получить токен.'
+        )
+        response = client.post(URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения можно использовать один раз.'
+        )
+
+    def test_02_new_signup_replaces_code(self, client):
+        old_code = signup_code(client)
+        new_code = signup_code(client)
+        data = {'username': SIGNUP_DATA['username']}
+        response = client.post(
+            URL_TOKEN, data={**data, 'confirmation_code': old_code}
+        )
+        if old_code != new_code:
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(
+            URL_TOKEN, data={**data, 'confirmation_code': new_code.lower()}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_expired_codes(self, client, settings):
+        from users.models import ConfirmationCode
+
+        settings.CONFIRMATION_CODE_LIFETIME = timedelta(seconds=-1)
+        code = signup_code(client)
+        response = client.post(URL_TOKEN, data={
+            'username': SIGNUP_DATA['username'], 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что истёкший код подтверждения не принимается.'
+        )
+
+        settings.CONFIRMATION_CODE_LIFETIME = timedelta(hours=1)
+        client.post(URL_SIGNUP, data={
+            'email': 'fresh@yamdb.fake', 'username': 'fresh_user'
+        })
+        out = StringIO()
+        call_command('purge_confirmation_codes', stdout=out)
+        assert 'Удалено истёкших кодов: 1' in out.getvalue()
+        assert list(
+            ConfirmationCode.objects.values_list('user__username', flat=True)
+        ) == ['fresh_user']
@@ -0,0 +1,183 @@
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+import pytest
+
+from tests.conftest import MANAGE_PATH
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+def stores(tmp_path):
+    from api.throttling import (
+        CacheCounterStore,
+        MemoryCounterStore,
+        SqliteCounterStore,
+    )
+
+    return [
+        MemoryCounterStore(),
+        CacheCounterStore(),
+        SqliteCounterStore(tmp_path / 'throttle.sqlite3'),
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Throttling:
+
+    @pytest.mark.parametrize('store_index', [0, 1, 2])
+    def test_01_sliding_window(self, tmp_path, store_index):
+        from api.throttling import sliding_window_hit
+
+        store = stores(tmp_path)[store_index]
+        results = [
+            sliding_window_hit(store, 'key', 3, 60, now=6000 + second)[0]
+            for second in range(4)
+        ]
+        assert results == [True, True, True, False], (
+            'Проверьте, что лимит скользящего окна не пропускает лишние '
+            'запросы.'
+        )
+        # В середине следующего окна половина прошлых запросов ещё
+        # учитывается: 4 * 0.5 + 1 <= 3.
+        allowed, _ = sliding_window_hit(store, 'key', 3, 60, now=6090)
+        assert allowed
+        allowed, wait = sliding_window_hit(store, 'key', 3, 60, now=6091)
+        assert not allowed and 0 < wait <= 60, (
+            'Проверьте, что запросы прошлого окна учитываются с весом и '
+            'что время ожидания рассчитывается.'
+        )
+        allowed, _ = sliding_window_hit(store, 'other', 3, 60, now=6091)
+        assert allowed, 'Проверьте, что счётчики разных ключей независимы.'
+
+    def test_02_signup_ip_limit(self, client, monkeypatch,
+                                django_assert_num_queries):
+        from api.throttling import SignupIPThrottle
+
+        monkeypatch.setattr(SignupIPThrottle, 'rate', '2/minute')
+        for number in range(2):
+            response = client.post(URL_SIGNUP, data={
+                'email': f'ip{number}@yamdb.fake', 'username': f'ip{number}'
+            })
+            assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = client.post(URL_SIGNUP, data={
+                'email': 'ip2@yamdb.fake', 'username': 'ip2'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что регистрация ограничена по IP-адресу и лишний '
+            'запрос отклоняется без обращения к базе.'
+        )
+        assert int(response['Retry-After']) > 0
+        response = client.post(
+            URL_SIGNUP,
+            data={'email': 'ip3@yamdb.fake', 'username': 'ip3'},
+            REMOTE_ADDR='10.0.0.2',
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что лимит считается для каждого IP-адреса отдельно.'
+        )
+
+    def test_03_identity_limit(self, client, monkeypatch):
+        from api.throttling import SignupIdentityThrottle, TokenIdentityThrottle
+
+        monkeypatch.setattr(SignupIdentityThrottle, 'rate', '2/hour')
+        monkeypatch.setattr(TokenIdentityThrottle, 'rate', '2/hour')
+        for number in range(2):
+            response = client.post(
+                URL_SIGNUP,
+                data={'email': 'same@yamdb.fake', 'username': f'same{number}'},
+                REMOTE_ADDR=f'10.0.1.{number}',
+            )
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+        response = client.post(
+            URL_SIGNUP,
+            data={'email': 'SAME@yamdb.fake', 'username': 'same2'},
+            REMOTE_ADDR='10.0.1.2',
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что регистрация ограничена по email независимо от '
+            'IP-адреса.'
+        )
+        data = {'username': 'guess', 'confirmation_code': 'wrong'}
+        for number in range(2):
+            response = client.post(
+                URL_TOKEN, data=data, REMOTE_ADDR='10.0.2.1'
+            )
+            assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.post(URL_TOKEN, data=data, REMOTE_ADDR='10.0.2.1')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подбор кода подтверждения ограничен по имени '
+            'пользователя.'
+        )
+        response = client.post(URL_TOKEN, data=data, REMOTE_ADDR='10.0.2.2')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что чужие попытки подбора кода не блокируют '
+            'пользователю получение токена с другого IP-адреса.'
+        )
+
+    def test_04_spoofed_forwarded_for(self, client, monkeypatch):
+        from api.throttling import SignupIPThrottle
+
+        monkeypatch.setattr(SignupIPThrottle, 'rate', '2/minute')
+        statuses = [
+            client.post(
+                URL_SIGNUP,
+                data={
+                    'email': f'xff{number}@yamdb.fake',
+                    'username': f'xff{number}',
+                },
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{number}',
+            ).status_code
+            for number in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подставленный клиентом заголовок '
+            'X-Forwarded-For не сбрасывает лимит по IP-адресу.'
+        )
+
+    def test_05_abstract_bases(self):
+        from api.throttling import CounterStore, SlidingWindowThrottle
+
+        for base in (CounterStore, SlidingWindowThrottle):
+            with pytest.raises(TypeError):
+                base()
+
+    @pytest.mark.parametrize('url,data', [
+        (URL_SIGNUP, []),
+        (URL_TOKEN, '"x"'),
+    ])
+    def test_06_non_object_body(self, client, url, data):
+        response = client.post(url, data=data, content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{url}` с телом JSON, не '
+            'являющимся объектом, возвращает ответ со статусом 400.'
+        )
+
+    @pytest.mark.parametrize('backend,store', [
+        ('file', 'api.throttling.SqliteCounterStore'),
+        ('locmem', 'api.throttling.CacheCounterStore'),
+    ])
+    def test_07_default_store(self, backend, store):
+        env = {**os.environ, 'CACHE_BACKEND': backend}
+        env.pop('THROTTLE_STORE', None)
+        result = subprocess.run(
+            [
+                sys.executable, '-c',
+                'from api_yamdb import settings; '
+                'print(settings.THROTTLE_COUNTER_STORE["BACKEND"])',
+            ],
+            cwd=MANAGE_PATH,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == store, (
+            'Проверьте, что с файловым кешем, не увеличивающим счётчики '
+            'атомарно, счётчики по умолчанию хранятся в SQLite.'
+        )
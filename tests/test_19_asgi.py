@@ -0,0 +1,115 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from tests.utils import create_single_comment, create_single_review
+
+
+def asgi_request(method, path, headers=(), body=b''):
+    """Запрос к приложению ASGI из asgi.py, возвращает статус, заголовки
+    и тело ответа."""
+    from api_yamdb.asgi import application
+
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (name.lower().encode(), value.encode())
+            for name, value in (
+                ('Host', 'testserver'),
+                ('Content-Length', str(len(body))),
+                *headers,
+            )
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    async_to_sync(application)(scope, receive, send)
+    start = messages[0]
+    response_headers = {
+        name.decode().lower(): value.decode()
+        for name, value in start['headers']
+    }
+    content = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], response_headers, content
+
+
+@pytest.fixture
+def catalog_urls(admin_client, many_titles):
+    title_id = many_titles[0]['id']
+    review = create_single_review(admin_client, title_id, 'Отзыв', 7).json()
+    create_single_comment(admin_client, title_id, review['id'], 'Комментарий')
+    return [
+        '/api/v1/titles/',
+        '/api/v1/titles/?year=2000',
+        f'/api/v1/titles/{title_id}/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        f'/api/v1/titles/{title_id}/reviews/',
+        f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+        f'/api/v1/titles/{title_id}/reviews/{review["id"]}/comments/',
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Asgi:
+
+    def test_01_same_responses(self, client, catalog_urls):
+        from django.core.cache import cache
+
+        for url in catalog_urls:
+            cache.clear()
+            status, _, content = asgi_request('GET', url)
+            assert status == HTTPStatus.OK
+            expected = client.get(url)
+            assert content == expected.content, (
+                f'Проверьте, что ответ на запрос к `{url}` через ASGI '
+                'совпадает с ответом через WSGI.'
+            )
+            status, _, content = asgi_request('GET', url)
+            assert content == expected.content, (
+                f'Проверьте, что ответ `{url}` из кеша через ASGI совпадает '
+                'с ответом через WSGI.'
+            )
+
+    def test_02_writes_and_authenticated_reads(self, admin_client,
+                                               token_user, many_titles):
+        title_id = many_titles[1]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        auth = ('Authorization', f'Bearer {token_user["access"]}')
+        status, _, content = asgi_request(
+            'POST',
+            url,
+            headers=[auth, ('Content-Type', 'application/json')],
+            body=json.dumps({'text': 'Через ASGI', 'score': 8}).encode(),
+        )
+        assert status == HTTPStatus.CREATED, (
+            'Проверьте, что через ASGI можно создать отзыв.'
+        )
+        status, _, content = asgi_request('GET', url, headers=[auth])
+        assert status == HTTPStatus.OK
+        assert json.loads(content)['count'] == 1, (
+            'Проверьте, что новый отзыв виден в списке отзывов через ASGI.'
+        )
+        status, _, _ = asgi_request('POST', url, body=b'{}', headers=[
+            ('Content-Type', 'application/json'),
+        ])
+        assert status == HTTPStatus.UNAUTHORIZED
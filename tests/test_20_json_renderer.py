@@ -0,0 +1,105 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_single_comment, create_single_review
+
+UNUSUAL_DATA = [
+    {'text': 'Строка с   и   внутри', 'emoji': '😀', 'empty': ''},
+    {
+        'datetime': datetime.datetime(
+            2023, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+        ),
+        'date': datetime.date(2023, 5, 1),
+        'time': datetime.time(12, 30),
+        'duration': datetime.timedelta(hours=1, seconds=5),
+    },
+    {'decimal': decimal.Decimal('7.50'), 'uuid': uuid.UUID(int=1)},
+    {'lazy': gettext_lazy('Произведение'), 'tuple': (1, 2), 1: 'int key'},
+    {'float': 7.333333333333333, 'big': 2 ** 70, 'none': None, 'bool': True},
+    [],
+    'plain string',
+]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20JsonRenderer:
+
+    @pytest.mark.parametrize('data', UNUSUAL_DATA)
+    def test_01_byte_identical(self, data):
+        from api.renderers import FastJSONRenderer
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        ), 'Проверьте, что FastJSONRenderer выводит те же байты, что JSONRenderer.'
+
+    def test_02_api_responses(self, admin_client, user_client, many_titles):
+        from api.renderers import FastJSONRenderer
+
+        title_id = many_titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Текст', 8)
+        create_single_comment(
+            admin_client, title_id, review.json()['id'], 'Ответ'
+        )
+        urls = [
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/',
+            '/api/v1/genres/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/'
+            'comments/',
+            '/api/v1/users/',
+            '/api/v1/users/me/',
+            '/api/v1/titles/0/',
+        ]
+        for url in urls:
+            response = admin_client.get(url)
+            assert isinstance(
+                response.accepted_renderer, FastJSONRenderer
+            ), 'Проверьте, что FastJSONRenderer подключён в настройках.'
+            assert response.content == JSONRenderer().render(response.data), (
+                f'Проверьте, что ответ `{url}` совпадает побайтно с выводом '
+                'JSONRenderer.'
+            )
+        response = admin_client.get(
+            '/api/v1/genres/', HTTP_ACCEPT='application/json; indent=4'
+        )
+        assert response.content == JSONRenderer().render(
+            response.data, 'application/json; indent=4'
+        ), 'Проверьте, что ответы с отступами совпадают с JSONRenderer.'
+
+    def test_03_parser(self, user_client, many_titles):
+        from rest_framework.parsers import JSONParser
+
+        from api.parsers import FastJSONParser
+
+        bodies = [
+            '{"text": "Отзыв \\u2028", "score": 5}'.encode(),
+            b'{"big": 100000000000000000000000}',
+            b'[1, 2.5, null, true]',
+        ]
+        for body in bodies:
+            assert FastJSONParser().parse(io.BytesIO(body)) == (
+                JSONParser().parse(io.BytesIO(body))
+            )
+        title_id = many_titles[0]['id']
+        response = user_client.post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data='{"text": "Через orjson", "score": 9}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201
+        response = user_client.post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data='{"text": NaN',
+            content_type='application/json',
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный JSON возвращает ответ 400.'
+        )
+        assert response.json()['detail'].startswith('JSON parse error')
@@ -0,0 +1,81 @@
+import pytest
+
+from tests.utils import create_single_comment, create_single_review
+
+
+def expected_data(serializer_class, queryset, results):
+    """Вывод обычного сериализатора для объектов из ответа, в его порядке."""
+    objects = {obj.pk: obj for obj in queryset}
+    return [
+        dict(serializer_class(objects[item['id']]).data) for item in results
+    ]
+
+
+def plain(data):
+    if isinstance(data, dict):
+        return {key: plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [plain(value) for value in data]
+    return data
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ValuesSerializers:
+
+    def test_01_titles(self, admin_client, user_client, many_titles):
+        from api.serializers import TitleReadSerializer
+        from reviews.models import Title
+
+        create_single_review(user_client, many_titles[0]['id'], 'Хорошо', 8)
+        Title.objects.create(name='Без категории и жанров', year=1999)
+        queryset = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        )
+        for url in (
+            '/api/v1/titles/',
+            '/api/v1/titles/?limit=100',
+            '/api/v1/titles/?year=2001',
+            '/api/v1/titles/?pagination=cursor&limit=5',
+            '/api/v1/titles/?search=произведение',
+        ):
+            results = admin_client.get(url).json()['results']
+            assert results
+            assert plain(results) == plain(expected_data(
+                TitleReadSerializer, queryset, results
+            )), (
+                f'Проверьте, что список `{url}` совпадает с выводом '
+                'TitleReadSerializer.'
+            )
+
+    def test_02_reviews_and_comments(self, admin_client, user_client,
+                                     moderator_client, many_titles,
+                                     django_assert_max_num_queries):
+        from api.serializers import CommentSerializer, ReviewSerializer
+        from reviews.models import Comment, Review
+
+        title_id = many_titles[0]['id']
+        review_ids = []
+        for number, client in enumerate(
+            (admin_client, user_client, moderator_client)
+        ):
+            review = create_single_review(
+                client, title_id, 'Отзыв', number + 1
+            )
+            review_ids.append(review.json()['id'])
+            create_single_comment(client, title_id, review_ids[0], 'Ответ')
+
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        # Произведение, страница отзывов с авторами, COUNT(*).
+        with django_assert_max_num_queries(3):
+            results = admin_client.get(url).json()['results']
+        assert len(results) == 3
+        assert results == expected_data(
+            ReviewSerializer, Review.objects.all(), results
+        ), 'Проверьте, что список отзывов совпадает с ReviewSerializer.'
+
+        url = f'/api/v1/titles/{title_id}/reviews/{review_ids[0]}/comments/'
+        results = admin_client.get(url).json()['results']
+        assert len(results) == 3
+        assert results == expected_data(
+            CommentSerializer, Comment.objects.all(), results
+        ), 'Проверьте, что список комментариев совпадает с CommentSerializer.'
@@ -0,0 +1,58 @@
+import pytest
+
+
+def sqlite_wrapper(path, **options):
+    from django.db.utils import ConnectionHandler
+
+    return ConnectionHandler({
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(path),
+            **options,
+        },
+    })['default']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22SqlitePragmas:
+
+    def test_01_production_pragmas(self, tmp_path, settings):
+        wrapper = sqlite_wrapper(
+            tmp_path / 'db.sqlite3',
+            PRAGMAS=settings.SQLITE_PRODUCTION_PRAGMAS,
+        )
+        try:
+            with wrapper.cursor() as cursor:
+                values = {}
+                for name in ('journal_mode', 'synchronous', 'busy_timeout',
+                             'cache_size', 'temp_store'):
+                    cursor.execute(f'PRAGMA {name}')
+                    values[name] = cursor.fetchone()[0]
+        finally:
+            wrapper.close()
+        assert values == {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'busy_timeout': 5000,
+            'cache_size': -64 * 1024,
+            'temp_store': 2,
+        }, 'Проверьте, что PRAGMA из настроек выполняются при подключении.'
+
+    def test_02_without_pragmas(self, tmp_path):
+        wrapper = sqlite_wrapper(tmp_path / 'db.sqlite3')
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                assert cursor.fetchone()[0] == 'delete'
+        finally:
+            wrapper.close()
+
+    @pytest.mark.parametrize('pragmas', [
+        {'journal_mode; DROP TABLE x': 'wal'},
+        {'journal_mode': 'wal; DROP TABLE x'},
+    ])
+    def test_03_invalid_pragmas(self, pragmas):
+        from core.signals import pragma_statements
+
+        with pytest.raises(ValueError):
+            pragma_statements(pragmas)
@@ -0,0 +1,140 @@
+import sqlite3
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review
+
+
+@pytest.fixture
+def replica(settings):
+    """Реплика `replica`, открытая на ту же тестовую базу, что и default."""
+    def add(**options):
+        connections.settings['replica'] = {
+            **connections['default'].settings_dict, **options
+        }
+        settings.DATABASE_REPLICAS = ['replica']
+        return connections['replica']
+
+    yield add
+    if 'replica' in connections.settings:
+        connections['replica'].close()
+        del connections.settings['replica']
+        if hasattr(connections._connections, 'replica'):
+            delattr(connections._connections, 'replica')
+
+
+def queries_by_alias(client, url, **kwargs):
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        response = client.get(url, **kwargs)
+    assert response.status_code == 200
+    return len(primary), len(replica)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ReplicaRouting:
+
+    def test_01_router(self, settings):
+        from core.routers import PrimaryReplicaRouter, database_routing
+        from reviews.models import Review
+
+        settings.DATABASE_REPLICAS = ['replica']
+        router = PrimaryReplicaRouter()
+        assert router.db_for_read(Review) is None, (
+            'Проверьте, что вне запросов маршрутизатор не выбирает базу.'
+        )
+        with database_routing(use_replica=True) as state:
+            assert router.db_for_read(Review) == 'replica'
+            assert router.db_for_write(Review) == 'default'
+            assert state.wrote
+            assert router.db_for_read(Review) == 'default', (
+                'Проверьте, что после записи запрос читает основную базу.'
+            )
+        with database_routing(use_replica=False):
+            assert router.db_for_read(Review) == 'default'
+        assert router.allow_migrate('replica', 'reviews') is False
+
+    def test_02_reads_and_stickiness(self, replica, settings, client,
+                                     user_client, admin_client, many_titles):
+        from django.core.cache import cache
+
+        from core.middleware import STICKY_COOKIE
+
+        replica()
+        title_id = many_titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        primary, replicated = queries_by_alias(client, '/api/v1/titles/')
+        assert primary == 0 and replicated > 0, (
+            'Проверьте, что анонимные запросы GET читают из реплики.'
+        )
+        with CaptureQueriesContext(connections['replica']) as replicated:
+            create_single_review(user_client, title_id, 'Свой отзыв', 7)
+        assert len(replicated) == 0, (
+            'Проверьте, что запросы POST выполняются в основной базе.'
+        )
+        # Клиент без хранилища cookie (curl, мобильные клиенты).
+        user_client.cookies.clear()
+        primary, replicated = queries_by_alias(user_client, url)
+        assert primary > 0 and replicated == 0, (
+            'Проверьте, что после записи пользователь с токеном читает '
+            'основную базу и без cookie.'
+        )
+        primary, replicated = queries_by_alias(admin_client, url)
+        assert primary == 0 and replicated > 0, (
+            'Проверьте, что запись одного пользователя не переключает '
+            'остальных на основную базу.'
+        )
+        create_single_review(admin_client, many_titles[1]['id'], 'Ещё', 5)
+        cache.clear()
+        primary, replicated = queries_by_alias(admin_client, url)
+        assert primary > 0 and replicated == 0, (
+            'Проверьте, что подписанная cookie тоже отмечает запись.'
+        )
+        settings.REPLICA_STICKY_SECONDS = 0
+        cache.clear()
+        primary, replicated = queries_by_alias(user_client, url)
+        assert primary == 0 and replicated > 0, (
+            'Проверьте, что по истечении REPLICA_STICKY_SECONDS пользователь '
+            'снова читает из реплики.'
+        )
+        settings.REPLICA_STICKY_SECONDS = 10
+        user_client.cookies[STICKY_COOKIE] = '1'
+        primary, replicated = queries_by_alias(user_client, url)
+        assert primary == 0 and replicated > 0, (
+            'Проверьте, что отметка о записи принимается только с '
+            'правильной подписью.'
+        )
+
+    def test_03_replicate_command(self, replica, tmp_path, many_titles):
+        from reviews.models import Title
+
+        with pytest.raises(CommandError):
+            call_command('replicate_db')
+        path = tmp_path / 'replica.sqlite3'
+        replica(NAME=str(path))
+        call_command('replicate_db')
+        connection = sqlite3.connect(path)
+        try:
+            count = connection.execute(
+                f'SELECT COUNT(*) FROM {Title._meta.db_table}'
+            ).fetchone()[0]
+        finally:
+            connection.close()
+        assert count == Title.objects.count() == len(many_titles), (
+            'Проверьте, что replicate_db копирует основную базу в реплики.'
+        )
+
+    def test_04_replicate_flushes_cache(self, replica, tmp_path, client,
+                                        many_titles):
+        replica(NAME=str(tmp_path / 'replica.sqlite3'))
+        call_command('replicate_db')
+        client.get('/api/v1/titles/')
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'HIT'
+        call_command('replicate_db')
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS', (
+            'Проверьте, что replicate_db сбрасывает кеш ответов API.'
+        )
@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_comment, create_single_review
+
+
+def query_plans(client, url):
+    """Планы SQLite (EXPLAIN QUERY PLAN) для запросов SELECT ответа на url."""
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(url).status_code == 200
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+            plans.append((query['sql'], [row[3] for row in cursor]))
+    return plans
+
+
+def is_full_scan(step):
+    return step.startswith('SCAN ') and ' INDEX ' not in f'{step} '
+
+
+@pytest.fixture
+def hot_urls(admin_client, user_client, many_titles):
+    """Адреса списков и признак сортировки по индексу без временной таблицы.
+
+    Фильтр по жанру сортирует отобранные через связующую таблицу записи.
+    """
+    title = many_titles[0]
+    review = create_single_review(user_client, title['id'], 'Текст', 8)
+    review_id = review.json()['id']
+    create_single_comment(admin_client, title['id'], review_id, 'Ответ')
+    reviews = f'/api/v1/titles/{title["id"]}/reviews/'
+    comments = f'{reviews}{review_id}/comments/'
+    return [
+        ('/api/v1/titles/', True),
+        ('/api/v1/titles/?pagination=cursor', True),
+        (f'/api/v1/titles/?year={title["year"]}', True),
+        (f'/api/v1/titles/?year={title["year"]}&pagination=cursor', True),
+        (f'/api/v1/titles/?category={title["category"]}', True),
+        (f'/api/v1/titles/?genre={title["genre"][0]}', False),
+        (reviews, True),
+        (reviews + '?pagination=cursor', True),
+        (comments, True),
+        (comments + '?pagination=cursor', True),
+    ]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Планы запросов SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test24QueryPlans:
+
+    def test_01_no_full_scans(self, admin_client, hot_urls):
+        for url, _ in hot_urls:
+            for sql, plan in query_plans(admin_client, url):
+                scans = [step for step in plan if is_full_scan(step)]
+                assert not scans, (
+                    f'Проверьте индексы: запрос к `{url}` читает таблицу '
+                    f'целиком ({", ".join(scans)}): {sql}'
+                )
+
+    def test_02_ordered_by_index(self, admin_client, hot_urls):
+        for url, ordered in hot_urls:
+            if not ordered:
+                continue
+            for sql, plan in query_plans(admin_client, url):
+                assert 'USE TEMP B-TREE FOR ORDER BY' not in plan, (
+                    f'Проверьте индексы: список `{url}` сортируется во '
+                    f'временной таблице: {sql}'
+                )
+
+    def test_03_no_redundant_pub_date_index(self):
+        from reviews.models import Comment, Review
+
+        with connection.cursor() as cursor:
+            for model in (Review, Comment):
+                table = model._meta.db_table
+                indexes = connection.introspection.get_constraints(
+                    cursor, table
+                )
+                single = [
+                    name for name, info in indexes.items()
+                    if info['index'] and info['columns'] == ['pub_date']
+                ]
+                assert not single, (
+                    f'Проверьте, что у `{table}` нет отдельного индекса по '
+                    f'pub_date: его заменяет составной индекс.'
+                )
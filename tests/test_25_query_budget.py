@@ -0,0 +1,139 @@
+import logging
+
+import pytest
+from django.urls import URLResolver, get_resolver
+
+from tests.utils import create_single_comment, create_single_review
+
+# Маршрут api/urls.py: (клиент, метод, адрес, данные, запросов к базе).
+ROUTES = {
+    'api-root': ('client', 'get', '/api/v1/', None, 0),
+    'users-list': ('admin_client', 'get', '/api/v1/users/', None, 3),
+    'users-detail': (
+        'admin_client', 'get', '/api/v1/users/{username}/', None, 2
+    ),
+    'users-me': ('user_client', 'get', '/api/v1/users/me/', None, 1),
+    'categories-list': ('client', 'get', '/api/v1/categories/', None, 2),
+    'categories-detail': (
+        'admin_client', 'delete', '/api/v1/categories/{category}/', None, 6
+    ),
+    'genres-list': ('client', 'get', '/api/v1/genres/', None, 2),
+    'genres-detail': (
+        'admin_client', 'delete', '/api/v1/genres/{genre}/', None, 5
+    ),
+    'titles-list': ('client', 'get', '/api/v1/titles/', None, 3),
+    'titles-detail': (
+        'client', 'get', '/api/v1/titles/{title_id}/', None, 2
+    ),
+    'reviews-list': (
+        'client', 'get', '/api/v1/titles/{title_id}/reviews/', None, 2
+    ),
+    'reviews-detail': (
+        'client', 'get', '/api/v1/titles/{title_id}/reviews/{review_id}/',
+        None, 3
+    ),
+    'comments-list': (
+        'client', 'get',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/', None, 2
+    ),
+    'comments-detail': (
+        'client', 'get',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/',
+        None, 3
+    ),
+    'signup': (
+        'client', 'post', '/api/v1/auth/signup/',
+        {'username': 'newuser', 'email': 'newuser@yamdb.fake'}, 6
+    ),
+    'token': (
+        'client', 'post', '/api/v1/auth/token/',
+        {'username': 'TestUser', 'confirmation_code': 'wrong'}, 2
+    ),
+    'response-cache-stats': (
+        'admin_client', 'get', '/api/v1/cache/stats/', None, 1
+    ),
+    'profiles': ('admin_client', 'get', '/api/v1/profiles/', None, 1),
+    'profile-detail': (
+        'admin_client', 'get', '/api/v1/profiles/missing/', None, 1
+    ),
+    'profile-collapsed': (
+        'admin_client', 'get', '/api/v1/profiles/missing/collapsed/', None, 1
+    ),
+}
+
+
+def route_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from route_names(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name
+
+
+@pytest.fixture
+def route_objects(admin_client, user_client, many_titles):
+    title = many_titles[0]
+    review = create_single_review(user_client, title['id'], 'Текст', 8)
+    comment = create_single_comment(
+        admin_client, title['id'], review.json()['id'], 'Ответ'
+    )
+    return {
+        'title_id': title['id'],
+        'review_id': review.json()['id'],
+        'comment_id': comment.json()['id'],
+        'category': title['category'],
+        'genre': title['genre'][0],
+        'username': 'TestUser',
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25QueryBudget:
+
+    def test_01_all_routes_pinned(self):
+        names = set(route_names(get_resolver('api.urls').url_patterns))
+        assert names == set(ROUTES), (
+            'Проверьте, что для каждого маршрута api/urls.py в ROUTES '
+            'указано число запросов к базе.'
+        )
+
+    @pytest.mark.parametrize('name', ROUTES)
+    def test_02_route_queries(self, request, name, route_objects,
+                              count_queries):
+        client_name, method, url, data, expected = ROUTES[name]
+        client = request.getfixturevalue(client_name)
+        kwargs = {'data': data} if data else {}
+        response, count = count_queries(
+            client, method, url.format(**route_objects), **kwargs
+        )
+        assert response.status_code < 500
+        assert count == expected, (
+            f'Маршрут `{name}` выполняет {count} запросов к базе вместо '
+            f'{expected}. Если изменение ожидаемо, обновите ROUTES.'
+        )
+
+    def test_03_server_timing(self, client, settings, many_titles):
+        settings.DEBUG = True
+        response = client.get('/api/v1/titles/')
+        assert response['Server-Timing'].startswith('db;dur='), (
+            'Проверьте, что в режиме DEBUG ответ содержит заголовок '
+            'Server-Timing со временем запросов к базе.'
+        )
+        assert 'desc="3 queries"' in response['Server-Timing']
+        settings.DEBUG = False
+        response = client.get('/api/v1/genres/')
+        assert not response.has_header('Server-Timing'), (
+            'Проверьте, что без DEBUG заголовок Server-Timing не отдаётся.'
+        )
+
+    def test_04_budget_log(self, client, settings, caplog, many_titles):
+        settings.QUERY_BUDGET_ROUTES = {'titles-list': 2}
+        with caplog.at_level(logging.WARNING, logger='core.middleware'):
+            client.get('/api/v1/titles/')
+            client.get('/api/v1/genres/')
+        messages = [record.getMessage() for record in caplog.records]
+        assert len(messages) == 1 and 'titles-list' in messages[0], (
+            'Проверьте, что в журнал попадают только маршруты, превысившие '
+            'бюджет запросов.'
+        )
@@ -0,0 +1,123 @@
+import re
+import sys
+import threading
+import time
+
+import pytest
+from rest_framework.test import APIClient
+
+COLLAPSED_LINE = re.compile(r'^\S+ \d+$')
+
+
+def api_client(token=None):
+    client = APIClient()
+    if token:
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token["access"]}')
+    return client
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.PROFILE_REQUESTS = True
+    settings.PROFILE_SAMPLE_INTERVAL = 0.0005
+    return settings
+
+
+def busy_request(seconds):
+    finish = time.perf_counter() + seconds
+    while time.perf_counter() < finish:
+        pass
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Profiling:
+
+    def test_01_stack_sampler(self):
+        from core.profiling import StackSampler
+
+        sampler = StackSampler(threading.get_ident(), 0.0005)
+        sampler.start()
+        busy_request(0.1)
+        stacks = sampler.stop()
+        assert stacks, 'Проверьте, что StackSampler снимает стеки потока.'
+        assert any(
+            stack.endswith('test_26_profiling:busy_request')
+            for stack in stacks
+        ), 'Проверьте, что стек заканчивается выполняемой функцией.'
+        assert all(';' in stack for stack in stacks)
+
+    def test_02_profile_request(self, profiling, token_admin):
+        client = api_client(token_admin)
+        interval = sys.getswitchinterval()
+        response = client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        assert sys.getswitchinterval() == interval, (
+            'Проверьте, что профилирование не меняет интервал '
+            'переключения потоков процесса.'
+        )
+        profile_id = response['X-Profile-Id']
+
+        response = client.get(f'/api/v1/profiles/{profile_id}/')
+        assert response.status_code == 200
+        profile = response.json()
+        assert profile['path'] == '/api/v1/titles/'
+        assert profile['status'] == 200
+        assert 'cumulative' in profile['stats'], (
+            'Проверьте, что профиль содержит таблицу cProfile.'
+        )
+        response = client.get(f'/api/v1/profiles/{profile_id}/collapsed/')
+        assert response['Content-Type'].startswith('text/plain')
+        lines = response.content.decode().splitlines()
+        assert len(lines) == len(profile['collapsed'].splitlines())
+        assert all(COLLAPSED_LINE.match(line) for line in lines), (
+            'Проверьте, что стеки отдаются в формате flamegraph.pl.'
+        )
+
+        listed = client.get('/api/v1/profiles/').json()
+        assert [item['id'] for item in listed] == [profile_id]
+        assert 'collapsed' not in listed[0]
+
+    def test_03_only_admins(self, profiling, token_user, token_admin):
+        response = api_client(token_user).get(
+            '/api/v1/titles/', HTTP_X_PROFILE='1'
+        )
+        assert not response.has_header('X-Profile-Id'), (
+            'Проверьте, что запросы не администраторов не профилируются.'
+        )
+        response = api_client().get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert not response.has_header('X-Profile-Id')
+        response = api_client(token_admin).get('/api/v1/titles/')
+        assert not response.has_header('X-Profile-Id'), (
+            'Проверьте, что без заголовка X-Profile запрос не профилируется.'
+        )
+        response = api_client(token_user).get('/api/v1/profiles/')
+        assert response.status_code == 403
+
+    def test_04_disabled(self, settings, token_admin):
+        from core.middleware import ProfilingMiddleware
+        from django.core.exceptions import MiddlewareNotUsed
+
+        settings.PROFILE_REQUESTS = False
+        settings.PROFILE_SAMPLE_RATE = 0
+        with pytest.raises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+        response = api_client(token_admin).get(
+            '/api/v1/titles/', HTTP_X_PROFILE='1'
+        )
+        assert not response.has_header('X-Profile-Id')
+
+    def test_05_history_and_sampling(self, settings, token_admin):
+        settings.PROFILE_SAMPLE_RATE = 1
+        settings.PROFILE_HISTORY = 2
+        client = api_client()
+        profile_ids = [
+            client.get('/api/v1/genres/')['X-Profile-Id'] for _ in range(3)
+        ]
+        admin = api_client(token_admin)
+        listed = admin.get('/api/v1/profiles/').json()
+        assert {item['id'] for item in listed} == set(profile_ids[1:]), (
+            'Проверьте, что хранятся только PROFILE_HISTORY последних '
+            'профилей.'
+        )
+        response = admin.get(f'/api/v1/profiles/{profile_ids[0]}/')
+        assert response.status_code == 404
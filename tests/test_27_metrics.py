@@ -0,0 +1,160 @@
+import re
+
+import pytest
+from rest_framework.test import APIClient
+
+from tests.test_19_asgi import asgi_request
+
+SAMPLE = re.compile(
+    r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?P<labels>\{[^}]*\})? '
+    r'(?P<value>[-+0-9.e]+|\+Inf|NaN)$'
+)
+
+
+def parse(text):
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith('#'):
+            assert re.match(r'^# (HELP|TYPE) \S+ ', line), line
+            continue
+        match = SAMPLE.match(line)
+        assert match, f'Строка не в формате Prometheus: {line}'
+        key = match['name'] + (match['labels'] or '')
+        samples[key] = float(match['value'])
+    return samples
+
+
+TOKEN = 'secret'
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(settings):
+    settings.METRICS_TOKEN = TOKEN
+
+
+def scrape(client):
+    response = client.get('/metrics', HTTP_AUTHORIZATION=f'Bearer {TOKEN}')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return parse(response.content.decode())
+
+
+def delta(before, after, key):
+    return after.get(key, 0) - before.get(key, 0)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Metrics:
+
+    def test_01_request_metrics(self, client, many_titles):
+        before = scrape(client)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/?pagination=cursor')
+        client.get('/не-существует/')
+        after = scrape(client)
+
+        requests = (
+            'yamdb_http_requests_total'
+            '{view="titles-list",method="GET",status="200"}'
+        )
+        assert delta(before, after, requests) == 3, (
+            'Проверьте, что /metrics считает запросы по маршрутам.'
+        )
+        assert delta(
+            before, after,
+            'yamdb_http_requests_total'
+            '{view="unmatched",method="GET",status="404"}',
+        ) == 1, 'Проверьте, что запросы без маршрута учитываются отдельно.'
+        latency = 'yamdb_http_request_duration_seconds'
+        labels = '{view="titles-list",method="GET"}'
+        assert delta(before, after, f'{latency}_count{labels}') == 3
+        assert delta(
+            before, after, f'{latency}_bucket{labels[:-1]},le="+Inf"}}'
+        ) == 3
+        assert delta(before, after, f'{latency}_sum{labels}') > 0
+        # Первый запрос: COUNT(*), страница и жанры; второй - из кеша.
+        assert delta(
+            before, after,
+            'yamdb_db_queries_per_request_sum{view="titles-list"}',
+        ) >= 3
+        assert delta(
+            before, after,
+            'yamdb_serializer_duration_seconds_count{view="titles-list"}',
+        ) >= 1, 'Проверьте, что учитывается время сериализаторов.'
+        assert delta(
+            before, after,
+            'yamdb_pagination_count_total{view="TitleViewSet",source="keyset"}',
+        ) == 1
+        assert delta(
+            before, after,
+            'yamdb_response_cache_total{viewset="TitleViewSet",result="hit"}',
+        ) >= 1
+
+    def test_02_histogram_buckets(self, client, many_titles):
+        client.get('/api/v1/genres/')
+        samples = scrape(client)
+        buckets = [
+            (key, value) for key, value in samples.items()
+            if key.startswith('yamdb_http_request_duration_seconds_bucket'
+                              '{view="genres-list",method="GET"')
+        ]
+        values = [value for _, value in buckets]
+        assert values == sorted(values), (
+            'Проверьте, что корзины гистограммы накопительные.'
+        )
+        assert buckets[-1][0].endswith('le="+Inf"}')
+        assert values[-1] == samples[
+            'yamdb_http_request_duration_seconds_count'
+            '{view="genres-list",method="GET"}'
+        ]
+
+    def test_03_auth_lookups(self, client, admin):
+        from api.authentication import ClaimsAccessToken
+
+        api_client = APIClient()
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(admin)}'
+        )
+        before = scrape(client)
+        api_client.get('/api/v1/users/me/')
+        api_client.get('/api/v1/users/me/')
+        after = scrape(client)
+        sources = [
+            delta(
+                before, after,
+                f'yamdb_auth_token_version_lookups_total{{source="{source}"}}',
+            )
+            for source in ('memory', 'cache', 'db')
+        ]
+        assert sum(sources) == 2, (
+            'Проверьте, что учитываются проверки версии токена.'
+        )
+
+    def test_04_token(self, client, settings):
+        assert client.get('/metrics').status_code == 403
+        response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        assert response.status_code == 200
+        settings.METRICS_TOKEN = ''
+        settings.DEBUG = False
+        assert client.get('/metrics').status_code == 404, (
+            'Проверьте, что без METRICS_TOKEN адрес /metrics закрыт вне '
+            'режима DEBUG.'
+        )
+        settings.DEBUG = True
+        assert client.get('/metrics').status_code == 200
+
+    def test_05_asgi(self):
+        status, headers, content = asgi_request(
+            'GET', '/metrics', headers=[('Authorization', f'Bearer {TOKEN}')]
+        )
+        assert status == 200, 'Проверьте, что /metrics доступен под ASGI.'
+        assert headers['content-type'].startswith('text/plain')
+        samples = parse(content.decode())
+        assert any(key.startswith('yamdb_http_requests_total') for key in samples)
+
+    def test_06_abstract_metric(self):
+        from core.metrics import Metric
+
+        with pytest.raises(TypeError):
+            Metric('yamdb_abstract', 'Метрика без выборки.')